@@ -14,9 +14,24 @@ Binance MCP Server - 币安交易所MCP服务
 __version__ = "1.0.0"
 __author__ = "Binance MCP Team"
 
-from .server import BinanceMCPServer
 from .config import ConfigManager
-from .broker import BinanceExchangeFactory
+
+# 服务器和工厂依赖fastmcp/ccxt，按需导入（PEP 562）
+_LAZY_ATTRS = {
+    "BinanceMCPServer": ".server",
+    "BinanceExchangeFactory": ".broker",
+}
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    
+    import importlib
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
 
 __all__ = [
     "BinanceMCPServer",
@@ -5,9 +5,19 @@ Broker ID注入工厂模块
 确保所有交易都能获得返佣收益。
 """
 
+import asyncio
+import hashlib
+import hmac
 import logging
-from typing import Dict, Any
-import ccxt
+import random
+import socket
+import threading
+import time
+from typing import TYPE_CHECKING, Callable, Dict, Any, Optional, Tuple
+
+if TYPE_CHECKING:
+    # ccxt导入开销较大（加载全部交易所类），仅在真正创建实例时导入
+    import ccxt.async_support as ccxt_async
 
 logger = logging.getLogger(__name__)
 
@@ -26,74 +36,451 @@ class BinanceExchangeFactory:
         'inverse': 'eFC56vBf',    # 反向合约broker ID
     }
     
+    # 与账户无关的exchange配置（类加载时构建一次）
+    _EXCHANGE_CONFIG_TEMPLATE = {
+        'enableRateLimit': True,  # 启用内置限流
+        'timeout': 10000,  # 请求超时（毫秒），限制尾延迟
+    }
+    
+    # Binance签名请求的有效时间窗口（毫秒），官方建议不超过5000
+    RECV_WINDOW = 5000
+    
+    # aiohttp连接池：总连接上限、每个主机的并发连接上限、空闲keep-alive保持时间与DNS缓存时间（秒）
+    HTTP_LIMIT = 256
+    HTTP_LIMIT_PER_HOST = 64
+    HTTP_KEEPALIVE_TIMEOUT = 75
+    HTTP_DNS_CACHE_TTL = 300
+    
+    # 连接的TCP keepalive探测：空闲多久开始探测、探测间隔（秒）与失败次数
+    # 防止NAT/负载均衡静默回收空闲连接，使连接池中的连接保持可用，避免请求时重新握手
+    TCP_KEEPALIVE_IDLE = 60
+    TCP_KEEPALIVE_INTERVAL = 10
+    TCP_KEEPALIVE_COUNT = 3
+    
+    # 所有缓存实例共用的aiohttp会话 (所属事件循环, 会话)，各账户的请求复用同一个连接池
+    _shared_session: Optional[Tuple[Any, Any]] = None
+    
+    # 瞬时错误（限流、交易所暂不可用）的重试：最多尝试次数与退避基数（秒）
+    RETRY_TRIES = 5
+    RETRY_BASE_DELAY = 0.2
+    
+    # 进程级exchange实例缓存
+    # 规则：同一组凭证（profile）+ 市场类型只保留一个实例，复用其已加载的markets和HTTP连接池；
+    # 每次新建实例都会重新load_markets并建立新的TCP/TLS连接，还会分散限流器的计数
+    _exchange_cache: Dict[str, "ccxt_async.binance"] = {}
+    _cache_lock = threading.Lock()
+    _cache_hits = 0
+    _cache_misses = 0
+    
+    # 同一环境（正式/沙盒）的缓存实例共享一个ccxt限流器
+    # Binance的请求权重按IP计算，各实例独立限流时合计仍可能超限；ccxt已按端点权重计费
+    _shared_throttlers: Dict[bool, Any] = {}
+    
+    # 同一环境被Binance限流（429/418）后的全局暂停截止时间 {是否沙盒: time.monotonic()时刻}
+    # 一个实例收到限流响应时，其他实例的请求也会被计入同一IP的权重，必须一起等待Retry-After
+    _rate_limit_pause: Dict[bool, float] = {}
+    
+    # 同一环境的缓存实例共享一次load_markets的结果 {是否沙盒: Future[markets]}
+    # Binance的市场列表与账户、市场类型无关，每个实例各自加载需要下载数MB的exchangeInfo
+    _shared_markets: Dict[bool, "asyncio.Future"] = {}
+    # 带凭证实例共用的币种信息 {是否沙盒: Future[currencies]}
+    # 币种的网络、手续费等信息需要签名接口获取，公共实例加载的只有由markets推导出的币种代码
+    _shared_currencies: Dict[bool, "asyncio.Future"] = {}
+    # 各环境共用markets的缓存实例，reload后一并更新
+    _market_exchanges: Dict[bool, list] = {}
+    
+    # 进行中的连接测试 {缓存键: Future}
+    _inflight_tests: Dict[str, "asyncio.Future"] = {}
+    
+    # 成功的连接测试结果缓存 {缓存键: (写入时间, 结果)}，健康检查在TTL内不再访问网络
+    TEST_RESULT_TTL = 30.0
+    _test_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+    
     @classmethod
-    def create_exchange(cls, account_config: Dict[str, Any]) -> ccxt.binance:
+    def _build_exchange_config(
+        cls,
+        account_config: Dict[str, Any],
+        default_type: str = 'spot'
+    ) -> Dict[str, Any]:
         """
-        创建带有broker ID的Binance exchange实例
+        构建ccxt exchange配置（同步与异步实例共用）
         
-        Args:
-            account_config: 账户配置，包含api_key, secret, sandbox等
-            
-        Returns:
-            配置了broker ID的ccxt.binance实例
-            
         Raises:
             ValueError: 当必要配置缺失时
-            Exception: 当创建exchange失败时
         """
-        # 验证必要配置
-        required_fields = ['api_key', 'secret']
-        for field in required_fields:
-            if not account_config.get(field):
-                raise ValueError(f"账户配置缺少必要字段: {field}")
+        # 验证必要配置（只访问公共接口的实例不带凭证）
+        public = account_config.get('public', False)
+        if not public:
+            required_fields = ['api_key', 'secret']
+            for field in required_fields:
+                if not account_config.get(field):
+                    raise ValueError(f"账户配置缺少必要字段: {field}")
         
-        # 构建exchange配置
+        # 构建exchange配置（ccxt构造时会deep_extend出新的options，模板本身不会被修改）
         exchange_config = {
-            'apiKey': account_config['api_key'],
-            'secret': account_config['secret'],
             'sandbox': account_config.get('sandbox', False),
-            'enableRateLimit': True,  # 启用内置限流
+            **cls._EXCHANGE_CONFIG_TEMPLATE,
             'options': {
-                'broker': cls.BROKER_IDS.copy(),  # 注入broker ID配置
-                # 其他可能的选项
-                'defaultType': 'spot',  # 默认为现货交易
+                'broker': cls.BROKER_IDS,  # 注入broker ID配置
+                'defaultType': default_type,  # 默认为现货交易
                 # 检查是否启用统一账户模式
                 'portfolioMargin': account_config.get('portfolio_margin', False),
+                'recvWindow': cls.RECV_WINDOW,
+                # 查询全部交易对的挂单权重较高，但工具允许不指定交易对，这里确认该用法
+                'warnOnFetchOpenOrdersWithoutSymbol': False,
             }
         }
         
+        if not public:
+            exchange_config['apiKey'] = account_config['api_key']
+            exchange_config['secret'] = account_config['secret']
+        
         # 如果有passphrase（某些交易所需要）
         if 'passphrase' in account_config:
             exchange_config['password'] = account_config['passphrase']
         
+        return exchange_config
+    
+    @classmethod
+    def _cache_key(cls, account_config: Dict[str, Any], default_type: str) -> str:
+        """计算exchange缓存键（凭证哈希，不保存明文）"""
+        raw = (
+            f"{account_config.get('api_key', '')}|{account_config.get('secret', '')}|"
+            f"{account_config.get('sandbox', False)}|{account_config.get('portfolio_margin', False)}|"
+            f"{default_type}"
+        )
+        return hashlib.sha256(raw.encode()).hexdigest()
+    
+    @classmethod
+    def create_exchange(
+        cls,
+        account_config: Dict[str, Any],
+        default_type: str = 'spot'
+    ) -> "ccxt_async.binance":
+        """
+        创建带有broker ID的异步Binance exchange实例（ccxt.async_support）
+        
+        相同凭证和市场类型返回进程内缓存的同一实例，其aiohttp会话在首次请求时建立并持续复用。
+        
+        Args:
+            account_config: 账户配置，包含api_key, secret, sandbox等
+            default_type: ccxt defaultType (spot, future, delivery, option)
+            
+        Returns:
+            配置了broker ID的ccxt.async_support.binance实例
+            
+        Raises:
+            ValueError: 当必要配置缺失时
+            Exception: 当创建exchange失败时
+        """
+        key = cls._cache_key(account_config, default_type)
+        
+        with cls._cache_lock:
+            exchange = cls._exchange_cache.get(key)
+            if exchange is not None:
+                cls._cache_hits += 1
+                return exchange
+            cls._cache_misses += 1
+            
+            exchange = cls.create_async_exchange(account_config, default_type)
+            sandbox = bool(account_config.get('sandbox', False))
+            cls._install_pooled_session(exchange)
+            cls._install_retry(exchange, sandbox)
+            cls._install_keyed_hmac(exchange)
+            cls._install_shared_markets(exchange, sandbox)
+            exchange.throttler = cls._shared_throttlers.setdefault(sandbox, exchange.throttler)
+            cls._exchange_cache[key] = exchange
+            return exchange
+    
+    @classmethod
+    def create_public_exchange(cls, sandbox: bool = False, default_type: str = 'spot') -> "ccxt_async.binance":
+        """
+        获取只访问公共接口（行情、市场信息）的缓存实例，不需要配置账户
+        
+        与账户实例共用连接池、限流器和markets。
+        
+        Args:
+            sandbox: 是否使用测试网
+            default_type: ccxt defaultType (spot, future, delivery, option)
+            
+        Returns:
+            不带凭证的ccxt.async_support.binance实例
+        """
+        return cls.create_exchange({'public': True, 'sandbox': sandbox}, default_type)
+    
+    @classmethod
+    def _install_pooled_session(cls, exchange: "ccxt_async.binance") -> None:
+        """
+        让缓存实例使用共享的、调优过的aiohttp连接池
+        
+        ccxt在首次请求时才于运行中的事件循环里创建会话（此时才能创建aiohttp对象），
+        且连接器参数写死，因此包装实例的open()，改为取用工厂的共享会话。
+        实例不持有共享会话（own_session=False），exchange.close()不会关闭它，
+        由close_all_exchanges()统一关闭。
+        """
+        base_open = exchange.open
+        exchange.own_session = False
+        
+        def open(lazy=False):
+            # 基类只完成事件循环与SSL上下文的初始化
+            base_open(lazy)
+            if exchange.session is None:
+                exchange.session = cls._get_shared_session(exchange)
+        
+        exchange.open = open
+    
+    @classmethod
+    def _get_shared_session(cls, exchange: "ccxt_async.binance") -> Any:
+        """获取当前事件循环的共享aiohttp会话，不存在或已关闭时创建"""
+        loop = asyncio.get_running_loop()
+        if cls._shared_session is not None:
+            session_loop, session = cls._shared_session
+            if session_loop is loop and not session.closed:
+                return session
+        
+        import aiohttp
+        
+        connector = aiohttp.TCPConnector(
+            ssl=exchange.ssl_context,
+            limit=cls.HTTP_LIMIT,
+            limit_per_host=cls.HTTP_LIMIT_PER_HOST,
+            keepalive_timeout=cls.HTTP_KEEPALIVE_TIMEOUT,
+            ttl_dns_cache=cls.HTTP_DNS_CACHE_TTL,
+            enable_cleanup_closed=True,
+            family=socket.AF_UNSPEC,
+            socket_factory=cls._create_keepalive_socket,
+        )
+        session = aiohttp.ClientSession(connector=connector, trust_env=exchange.aiohttp_trust_env)
+        cls._shared_session = (loop, session)
+        return session
+    
+    @classmethod
+    def _create_keepalive_socket(cls, addr_info: Tuple[Any, ...]) -> socket.socket:
+        """创建开启TCP keepalive的socket（aiohttp连接器的socket_factory）"""
+        family, type_, proto, _, _ = addr_info
+        sock = socket.socket(family=family, type=type_, proto=proto)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        # 探测参数的选项名因平台而异，不支持的平台沿用系统默认值
+        for option, value in (
+            ('TCP_KEEPIDLE', cls.TCP_KEEPALIVE_IDLE),
+            ('TCP_KEEPINTVL', cls.TCP_KEEPALIVE_INTERVAL),
+            ('TCP_KEEPCNT', cls.TCP_KEEPALIVE_COUNT),
+        ):
+            if hasattr(socket, option):
+                sock.setsockopt(socket.IPPROTO_TCP, getattr(socket, option), value)
+        return sock
+    
+    @classmethod
+    def _install_shared_markets(cls, exchange: "ccxt_async.binance", sandbox: bool) -> None:
+        """
+        让同一环境的缓存实例共用一次市场加载
+        
+        第一个需要markets的实例负责请求，其余实例（包括并发加载的）直接用其结果set_markets；
+        显式reload会重新加载一次并更新同一环境的所有缓存实例；带参数的加载仍走ccxt原逻辑。
+        币种信息只在带凭证的实例间共用，公共实例由markets推导币种代码。
+        """
+        base_load_markets = exchange.load_markets
+        authenticated = exchange.check_required_credentials(False)
+        cls._market_exchanges.setdefault(sandbox, []).append(exchange)
+        
+        def forget_failed_load(shared: Dict[bool, "asyncio.Future"]) -> Callable[["asyncio.Future"], None]:
+            # 加载失败时允许下一次调用重试
+            def callback(future: "asyncio.Future") -> None:
+                if (future.cancelled() or future.exception() is not None) and shared.get(sandbox) is future:
+                    shared.pop(sandbox, None)
+            return callback
+        
+        async def load_shared(reload: bool) -> Any:
+            await base_load_markets(reload)
+            if authenticated:
+                # 带凭证的加载同时取得了完整的币种信息，直接供其他带凭证的实例使用
+                future = cls._shared_currencies[sandbox] = asyncio.get_running_loop().create_future()
+                future.set_result(exchange.currencies)
+            elif reload:
+                # 公共实例的reload不含币种信息，带凭证的实例下次使用时重新加载，以包含新上线的币种
+                cls._shared_currencies.pop(sandbox, None)
+            return exchange.markets
+        
+        async def shared_currencies(instance: "ccxt_async.binance") -> Any:
+            if not instance.check_required_credentials(False):
+                return None
+            future = cls._shared_currencies.get(sandbox)
+            if future is None:
+                future = cls._shared_currencies[sandbox] = asyncio.ensure_future(instance.fetch_currencies())
+                future.add_done_callback(forget_failed_load(cls._shared_currencies))
+            return await asyncio.shield(future)
+        
+        async def load_markets(reload=False, params={}):
+            if params or (exchange.markets is not None and not reload):
+                return await base_load_markets(reload, params)
+            
+            future = cls._shared_markets.get(sandbox)
+            # 并发的reload共用进行中的那一次加载
+            if future is None or (reload and future.done()):
+                future = cls._shared_markets[sandbox] = asyncio.ensure_future(load_shared(reload))
+                future.add_done_callback(forget_failed_load(cls._shared_markets))
+            
+            markets = await asyncio.shield(future)
+            if reload:
+                for other in cls._market_exchanges.get(sandbox, ()):
+                    if other is not exchange:
+                        other.set_markets(markets, await shared_currencies(other))
+            elif exchange.markets is None:
+                exchange.set_markets(markets, await shared_currencies(exchange))
+            return exchange.markets
+        
+        exchange.load_markets = load_markets
+    
+    @classmethod
+    async def reload_markets(cls, sandbox: bool = False) -> int:
+        """
+        重新加载某一环境的市场列表（新上线的交易对等），并更新该环境的所有缓存实例
+        
+        服务运行期间由BinanceMCPTools按MARKETS_REFRESH_INTERVAL定期调用。
+        
+        Args:
+            sandbox: 是否为沙盒环境
+            
+        Returns:
+            更新后的市场数量（该环境没有缓存实例时为0）
+        """
+        exchanges = cls._market_exchanges.get(sandbox)
+        if not exchanges:
+            return 0
+        markets = await exchanges[0].load_markets(reload=True)
+        return len(markets)
+    
+    @classmethod
+    def _install_retry(cls, exchange: "ccxt_async.binance", sandbox: bool = False) -> None:
+        """
+        为实例的每个HTTP请求加上指数退避+随机抖动的重试
+        
+        包装的是ccxt所有REST请求的统一入口fetch2，重试的是单个请求而不是整个工具，
+        多步骤的工具（如划转）不会被整体重放；每次重试都会重新签名并经过限流器。
+        限流错误（429/418）表示请求未被执行，任何请求都可重试；
+        交易所不可用（5xx）时写请求可能已生效，只重试GET请求。
+        
+        收到限流响应时按Retry-After（至少为退避时间）暂停同一环境的所有缓存实例，
+        避免其他账户在封禁窗口内继续请求、把429升级为418封IP。
+        """
+        import ccxt
+        
+        rate_limit_errors = (ccxt.RateLimitExceeded, ccxt.DDoSProtection)
+        base_fetch2 = exchange.fetch2
+        
+        async def fetch2(path, api='public', method='GET', params={}, headers=None, body=None, config={}):
+            retryable = rate_limit_errors + (ccxt.ExchangeNotAvailable,) if method == 'GET' else rate_limit_errors
+            for attempt in range(cls.RETRY_TRIES):
+                pause = cls._rate_limit_pause.get(sandbox, 0.0) - time.monotonic()
+                if pause > 0:
+                    await asyncio.sleep(pause)
+                try:
+                    return await base_fetch2(path, api, method, params, headers, body, config)
+                except retryable as e:
+                    if attempt == cls.RETRY_TRIES - 1:
+                        raise
+                    delay = cls.RETRY_BASE_DELAY * 2 ** attempt + random.random() * cls.RETRY_BASE_DELAY
+                    if isinstance(e, rate_limit_errors):
+                        delay = max(delay, cls._retry_after(exchange))
+                        until = time.monotonic() + delay
+                        if until > cls._rate_limit_pause.get(sandbox, 0.0):
+                            cls._rate_limit_pause[sandbox] = until
+                    logger.warning("%s %s failed (%s), retrying in %.2fs", method, path, type(e).__name__, delay)
+                    await asyncio.sleep(delay)
+        
+        exchange.fetch2 = fetch2
+    
+    @staticmethod
+    def _install_keyed_hmac(exchange: "ccxt_async.binance") -> None:
+        """
+        用预先以secret初始化的HMAC-SHA256为实例签名
+        
+        ccxt每次签名都用secret重新初始化HMAC（密钥填充与两轮压缩），
+        这里只初始化一次，签名时复制其状态；RSA/Ed25519密钥仍走ccxt原逻辑。
+        """
+        secret = exchange.secret
+        if not isinstance(secret, str) or not secret or 'PRIVATE KEY' in secret:
+            return
+        
+        key = secret.encode()
+        keyed = hmac.new(key, digestmod=hashlib.sha256)
+        base_hmac = exchange.hmac
+        
+        def keyed_hmac(request, secret, algorithm=hashlib.sha256, digest='hex'):
+            if secret == key and algorithm is hashlib.sha256 and digest == 'hex':
+                signer = keyed.copy()
+                signer.update(request)
+                return signer.hexdigest()
+            return base_hmac(request, secret, algorithm, digest)
+        
+        exchange.hmac = keyed_hmac
+    
+    @staticmethod
+    def _retry_after(exchange: "ccxt_async.binance") -> float:
+        """读取最近一次响应的Retry-After头（秒），没有时返回0"""
+        headers = getattr(exchange, 'last_response_headers', None)
+        if not isinstance(headers, dict):
+            return 0.0
+        for name, value in headers.items():
+            if name.lower() == 'retry-after':
+                try:
+                    return float(value)
+                except (TypeError, ValueError):
+                    return 0.0
+        return 0.0
+    
+    @classmethod
+    def create_async_exchange(
+        cls,
+        account_config: Dict[str, Any],
+        default_type: str = 'spot'
+    ) -> "ccxt_async.binance":
+        """
+        创建不经过缓存的异步Binance exchange实例
+        
+        调用方负责在使用完毕后 ``await exchange.close()`` 释放aiohttp会话。
+        
+        Args:
+            account_config: 账户配置，包含api_key, secret, sandbox等
+            default_type: ccxt defaultType (spot, future, delivery, option)
+            
+        Returns:
+            配置了broker ID的ccxt.async_support.binance实例
+        """
+        exchange_config = cls._build_exchange_config(account_config, default_type)
+        
         try:
-            # 创建exchange实例
-            exchange = ccxt.binance(exchange_config)
+            import ccxt.async_support as ccxt_async
+            
+            exchange = ccxt_async.binance(exchange_config)
             
             # 验证broker ID注入是否成功
             cls._verify_broker_injection(exchange)
             
-            logger.info(f"Created Binance exchange instance (sandbox: {account_config.get('sandbox', False)})")
-            logger.debug(f"Broker IDs injected: {cls.BROKER_IDS}")
-            
+            logger.info("Created async Binance exchange instance (sandbox: %s)", account_config.get('sandbox', False))
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Broker IDs injected: %s", cls.BROKER_IDS)
             return exchange
             
         except Exception as e:
-            logger.error(f"Failed to create Binance exchange: {e}")
+            logger.error("Failed to create async Binance exchange: %s", e)
             raise RuntimeError(f"创建Binance交易所实例失败: {e}")
     
     @classmethod
-    def _verify_broker_injection(cls, exchange: ccxt.binance) -> None:
+    def _verify_broker_injection(cls, exchange: "ccxt_async.binance") -> None:
         """验证broker ID注入是否成功"""
         if 'broker' not in exchange.options:
             raise RuntimeError("Broker ID注入失败: options中未找到broker配置")
         
         injected_brokers = exchange.options['broker']
+        if injected_brokers.items() >= cls.BROKER_IDS.items():
+            return
+        
         for market_type, expected_broker in cls.BROKER_IDS.items():
             if injected_brokers.get(market_type) != expected_broker:
                 logger.warning(
-                    f"Broker ID可能未正确注入 - {market_type}: "
-                    f"期望 {expected_broker}, 实际 {injected_brokers.get(market_type)}"
+                    "Broker ID可能未正确注入 - %s: 期望 %s, 实际 %s",
+                    market_type, expected_broker, injected_brokers.get(market_type)
                 )
     
     @classmethod
@@ -102,16 +489,47 @@ class BinanceExchangeFactory:
         return cls.BROKER_IDS.copy()
     
     @classmethod
-    def test_exchange_connection(cls, account_config: Dict[str, Any]) -> Dict[str, Any]:
+    async def test_exchange_connection(
+        cls,
+        account_config: Dict[str, Any],
+        force: bool = False
+    ) -> Dict[str, Any]:
         """
         测试交易所连接
         
+        同一账户的并发测试共享同一次请求，避免重复消耗Binance限流额度；
+        成功结果在TEST_RESULT_TTL秒内直接复用。
+        
         Args:
             account_config: 账户配置
+            force: 是否跳过结果缓存，强制重新测试
             
         Returns:
             连接测试结果
         """
+        key = cls._cache_key(account_config, 'spot')
+        
+        if not force:
+            entry = cls._test_cache.get(key)
+            if entry and time.monotonic() - entry[0] < cls.TEST_RESULT_TTL:
+                return dict(entry[1])
+        
+        # 检查与登记之间没有await，事件循环内无需加锁
+        future = cls._inflight_tests.get(key)
+        if future is None:
+            future = asyncio.ensure_future(cls._run_connection_test(account_config))
+            cls._inflight_tests[key] = future
+            future.add_done_callback(lambda _: cls._inflight_tests.pop(key, None))
+        
+        return await asyncio.shield(future)
+    
+    @classmethod
+    async def _run_connection_test(cls, account_config: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        执行一次连接测试
+        
+        公开API（服务器时间）与私有API（账户余额）并发请求。
+        """
         test_result = {
             'success': False,
             'error': None,
@@ -121,36 +539,53 @@ class BinanceExchangeFactory:
         }
         
         try:
-            exchange = cls.create_exchange(account_config)
+            exchange = cls.create_async_exchange(account_config)
+        except Exception as e:
+            test_result['error'] = str(e)
+            logger.error("Exchange connection test failed: %s", e)
+            return test_result
+        
+        try:
+            server_time, account_info = await asyncio.gather(
+                exchange.fetch_time(),
+                exchange.fetch_balance(),
+                return_exceptions=True
+            )
             
-            # 测试公开API（获取服务器时间）
-            try:
-                server_time = exchange.fetch_time()
+            # 公开API（获取服务器时间）
+            if isinstance(server_time, BaseException):
+                logger.warning("Public API test failed: %s", server_time)
+            else:
                 test_result['server_time'] = server_time
                 logger.info("Public API connection successful")
-            except Exception as e:
-                logger.warning(f"Public API test failed: {e}")
-            
-            # 测试私有API（获取账户信息）
-            try:
-                account_info = exchange.fetch_balance()
-                test_result['account_info'] = {
-                    'currencies': list(account_info.keys())[:5],  # 只返回前5个币种
-                    'total_currencies': len(account_info)
-                }
-                logger.info("Private API connection successful")
-            except Exception as e:
-                logger.warning(f"Private API test failed: {e}")
-                test_result['error'] = str(e)
+            
+            # 私有API（获取账户信息）
+            if isinstance(account_info, BaseException):
+                logger.warning("Private API test failed: %s", account_info)
+                test_result['error'] = str(account_info)
                 return test_result
             
+            test_result['account_info'] = {
+                'currencies': list(account_info.keys())[:5],  # 只返回前5个币种
+                'total_currencies': len(account_info)
+            }
+            logger.info("Private API connection successful")
+            
             # 验证broker ID
             test_result['broker_injected'] = 'broker' in exchange.options
             test_result['success'] = True
             
+            # 只缓存成功结果，失败时下次调用仍会重新测试
+            cls._test_cache[cls._cache_key(account_config, 'spot')] = (
+                time.monotonic(), dict(test_result)
+            )
+            
         except Exception as e:
             test_result['error'] = str(e)
-            logger.error(f"Exchange connection test failed: {e}")
+            logger.error("Exchange connection test failed: %s", e)
+        finally:
+            # 释放aiohttp会话
+            await exchange.close()
         
         return test_result
     
@@ -159,7 +594,7 @@ class BinanceExchangeFactory:
         cls, 
         account_config: Dict[str, Any], 
         market_type: str = 'spot'
-    ) -> ccxt.binance:
+    ) -> "ccxt_async.binance":
         """
         为特定市场类型创建exchange实例
         
@@ -170,21 +605,69 @@ class BinanceExchangeFactory:
         Returns:
             配置了特定市场类型的exchange实例
         """
-        exchange = cls.create_exchange(account_config)
-        
-        # 根据市场类型设置默认选项
+        # 根据市场类型确定默认选项
         if market_type in ['future', 'futures', 'swap']:
-            exchange.options['defaultType'] = 'future'
+            default_type = 'future'
         elif market_type in ['delivery', 'coin']:
-            exchange.options['defaultType'] = 'delivery'  
+            default_type = 'delivery'
         elif market_type == 'option':
-            exchange.options['defaultType'] = 'option'
+            default_type = 'option'
         else:
-            exchange.options['defaultType'] = 'spot'
+            default_type = 'spot'
+        
+        exchange = cls.create_exchange(account_config, default_type)
+        exchange.options['defaultType'] = default_type
         
-        logger.info(f"Created exchange for market type: {market_type}")
+        logger.info("Created exchange for market type: %s", market_type)
         return exchange
     
+    @classmethod
+    def clear_exchange_cache(cls) -> None:
+        """清除进程级exchange实例缓存及连接测试结果缓存"""
+        with cls._cache_lock:
+            cls._exchange_cache.clear()
+            cls._shared_throttlers.clear()
+            cls._rate_limit_pause.clear()
+            cls._shared_session = None
+            cls._shared_markets.clear()
+            cls._shared_currencies.clear()
+            cls._market_exchanges.clear()
+            cls._cache_hits = 0
+            cls._cache_misses = 0
+        cls._test_cache.clear()
+        logger.info("Exchange factory cache cleared")
+    
+    @classmethod
+    async def close_all_exchanges(cls) -> None:
+        """关闭所有缓存实例的HTTP会话并清空缓存（服务停止时调用）"""
+        with cls._cache_lock:
+            exchanges = list(cls._exchange_cache.values())
+        
+        results = await asyncio.gather(
+            *(exchange.close() for exchange in exchanges),
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                logger.warning("Failed to close exchange session: %s", result)
+        
+        if cls._shared_session is not None:
+            session_loop, session = cls._shared_session
+            if session_loop is asyncio.get_running_loop():
+                await session.close()
+        
+        cls.clear_exchange_cache()
+    
+    @classmethod
+    def get_exchange_cache_stats(cls) -> Dict[str, int]:
+        """获取exchange缓存统计信息"""
+        return {
+            'size': len(cls._exchange_cache),
+            'hits': cls._cache_hits,
+            'misses': cls._cache_misses,
+            'test_results': len(cls._test_cache),
+        }
+    
     @classmethod 
     def get_supported_market_types(cls) -> list:
         """获取支持的市场类型"""
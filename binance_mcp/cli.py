@@ -11,9 +11,10 @@ CLI命令行接口模块
 
 import os
 import sys
-import json
+import asyncio
 import time
 import signal
+import socket
 import logging
 from pathlib import Path
 from typing import Optional, Dict, Any
@@ -21,15 +22,17 @@ from typing import Optional, Dict, Any
 import click
 
 from . import __version__
-from .config import ConfigManager
-from .simple_server import SimpleBinanceMCPServer
-from .broker import exchange_factory
+from .config import ConfigManager, dump_json_bytes
+from .eventloop import install_uvloop
+from .log_context import CallIdFilter
 
-# 配置日志
+# 配置日志（call_id为工具调用的关联ID，不在工具调用中时为"-"）
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    format='%(asctime)s - %(name)s - %(levelname)s - [%(call_id)s] %(message)s'
 )
+for _handler in logging.getLogger().handlers:
+    _handler.addFilter(CallIdFilter())
 logger = logging.getLogger(__name__)
 
 
@@ -41,6 +44,9 @@ def cli(verbose):
     if verbose:
         logging.getLogger().setLevel(logging.DEBUG)
         logger.debug("启用详细日志模式")
+    
+    # 必须在任何子命令调用asyncio.run之前设置事件循环策略
+    install_uvloop()
 
 
 @cli.command()
@@ -119,6 +125,7 @@ def start(port, host, daemon):
             start_daemon(host, port)
         else:
             # 前台运行模式
+            from .simple_server import SimpleBinanceMCPServer
             server = SimpleBinanceMCPServer(port=port, host=host)
             
             # 设置信号处理（仅在主线程中）
@@ -210,13 +217,12 @@ def status(port, json_output):
             "accounts": {}
         }
         
-        # 账户信息
-        accounts = config_manager.list_accounts()
-        for account_id, account_info in accounts.items():
+        # 账户信息（单次遍历，无需解密）
+        for account_id, account_info in config_manager.summarize_accounts().items():
             status_info["accounts"][account_id] = {
-                "description": account_info.get("description", ""),
-                "sandbox": account_info.get("sandbox", False),
-                "valid": config_manager.validate_account(account_id)
+                "description": account_info["description"],
+                "sandbox": account_info["sandbox"],
+                "valid": account_info["valid"]
             }
         
         # 如果服务在运行，获取更多信息
@@ -230,7 +236,7 @@ def status(port, json_output):
                 status_info["server_error"] = str(e)
         
         if json_output:
-            click.echo(json.dumps(status_info, indent=2, ensure_ascii=False))
+            click.echo(dump_json_bytes(status_info).decode('utf-8'))
         else:
             # 格式化输出
             click.echo("=== Binance MCP 服务状态 ===")
@@ -270,7 +276,7 @@ def list(json_output):
             return
         
         if json_output:
-            click.echo(json.dumps(accounts, indent=2, ensure_ascii=False))
+            click.echo(dump_json_bytes(accounts).decode('utf-8'))
         else:
             click.echo(f"已配置账户 ({len(accounts)} 个):")
             for account_id, info in accounts.items():
@@ -326,7 +332,8 @@ def test_connection(account_id: str):
         click.echo("正在连接...")
         
         # 使用exchange工厂测试连接
-        test_result = exchange_factory.test_exchange_connection(account_config)
+        from .broker import exchange_factory
+        test_result = asyncio.run(exchange_factory.test_exchange_connection(account_config))
         
         if test_result["success"]:
             click.echo("✓ 连接成功")
@@ -346,16 +353,28 @@ def test_connection(account_id: str):
         sys.exit(1)
 
 
+# 端口探测超时（秒）
+_PROBE_TIMEOUT = 0.2
+
+
 def is_server_running(port: int) -> bool:
     """检查服务器是否在指定端口运行"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.settimeout(_PROBE_TIMEOUT)
     try:
-        import socket
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        result = sock.connect_ex(('127.0.0.1', port))
-        sock.close()
-        return result == 0
-    except Exception:
+        sock.connect(('127.0.0.1', port))
+        return True
+    except ConnectionRefusedError:
+        logger.debug("Port %s: connection refused", port)
         return False
+    except socket.timeout:
+        logger.debug("Port %s: probe timed out after %ss", port, _PROBE_TIMEOUT)
+        return False
+    except OSError as e:
+        logger.debug("Port %s: probe failed: %s", port, e)
+        return False
+    finally:
+        sock.close()
 
 
 def get_pid_file_path(port: int) -> Path:
@@ -363,14 +382,92 @@ def get_pid_file_path(port: int) -> Path:
     return Path.home() / ".config" / "binance-mcp" / f"mcp_{port}.pid"
 
 
+# 等待守护进程初始化完成信号的超时（秒）
+_DAEMON_READY_TIMEOUT = 5.0
+
+
+def _daemonize():
+    """
+    Unix双重fork的第二阶段：在第一次fork出的子进程中调用
+    
+    新建会话脱离控制终端，再fork一次使守护进程不是会话首进程（无法重新获得终端），
+    并重定向标准输入输出。
+    """
+    os.setsid()
+    if os.fork():
+        os._exit(0)
+    
+    os.chdir('/')
+    os.umask(0o022)
+    
+    devnull = os.open(os.devnull, os.O_RDWR)
+    for fd in (0, 1, 2):
+        os.dup2(devnull, fd)
+    os.close(devnull)
+
+
 def start_daemon(host: str, port: int):
     """以守护进程模式启动服务"""
-    import subprocess
-    
     # 创建PID文件目录
     pid_file = get_pid_file_path(port)
     pid_file.parent.mkdir(parents=True, exist_ok=True)
     
+    if not hasattr(os, 'fork'):
+        # Windows不支持fork，回退到子进程方式
+        _start_daemon_subprocess(host, port, pid_file)
+        return
+    
+    import select
+    
+    ready_r, ready_w = os.pipe()
+    child_pid = os.fork()
+    
+    if child_pid == 0:
+        # 子进程（双重fork的第一次）：脱离终端后在本进程内启动服务，无需再启动一个Python解释器
+        os.close(ready_r)
+        exit_code = 0
+        try:
+            _daemonize()
+            with open(pid_file, 'w') as f:
+                f.write(str(os.getpid()))
+            
+            from .simple_server import SimpleBinanceMCPServer
+            server = SimpleBinanceMCPServer(port=port, host=host)
+            
+            # 服务对象初始化完成，通知父进程；此时服务尚未开始运行，
+            # 之后server.run()中的失败父进程无法得知
+            os.write(ready_w, b"READY")
+            os.close(ready_w)
+            
+            server.run()
+        except Exception as e:
+            logger.error("Daemon failed: %s", e)
+            exit_code = 1
+        finally:
+            os._exit(exit_code)
+    
+    # 父进程：回收第一层子进程，等待就绪信号
+    os.close(ready_w)
+    os.waitpid(child_pid, 0)
+    
+    readable, _, _ = select.select([ready_r], [], [], _DAEMON_READY_TIMEOUT)
+    message = os.read(ready_r, 5) if readable else b""
+    os.close(ready_r)
+    
+    if message == b"READY":
+        daemon_pid = pid_file.read_text().strip()
+        # 服务使用stdio传输，不监听端口，无法探测是否已开始运行；这里只表示已fork并完成初始化
+        click.echo(f"MCP服务进程已fork到后台并完成初始化 (PID: {daemon_pid})，未确认服务已开始运行")
+    else:
+        click.echo("服务启动失败", err=True)
+        pid_file.unlink(missing_ok=True)
+        sys.exit(1)
+
+
+def _start_daemon_subprocess(host: str, port: int, pid_file: Path):
+    """通过子进程启动守护服务（不支持fork的平台）"""
+    import subprocess
+    
     # 启动子进程
     cmd = [sys.executable, "-m", "binance_mcp.cli", "start", 
            "--host", host, "--port", str(port)]
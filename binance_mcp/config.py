@@ -7,13 +7,36 @@
 
 import os
 import json
+import base64
+import hashlib
 import logging
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 from pathlib import Path
-from cryptography.fernet import Fernet
+
+try:
+    import orjson
+except ImportError:  # orjson为可选依赖，缺失时回退到标准库json
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
+# SecretBox密文前缀；不带此前缀的密文为旧版Fernet格式（以"gAAAAA"开头）
+_BOX_TOKEN_PREFIX = "nacl:"
+
+
+def load_json_bytes(data: bytes) -> Any:
+    """解析JSON字节串"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data.decode('utf-8'))
+
+
+def dump_json_bytes(obj: Any) -> bytes:
+    """序列化为带缩进的UTF-8 JSON字节串"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+
 
 class ConfigManager:
     """配置管理器"""
@@ -27,8 +50,16 @@ class ConfigManager:
         # 确保配置目录存在
         self.config_dir.mkdir(parents=True, exist_ok=True)
         
-        # 初始化加密密钥
-        self._cipher = Fernet(self._get_encryption_key())
+        # 初始化加密密钥（SecretBox实例在首次加解密时创建）
+        self._key = self._get_encryption_key()
+        self._box = None
+        self._legacy_cipher = None
+        
+        # 解密结果缓存 {account_id: ((密文api_key, 密文secret), 解密后的账户配置)}
+        self._account_cache: Dict[str, Tuple[Tuple[str, str], Dict[str, Any]]] = {}
+        # 配置版本号，每次保存递增，用于使list_accounts结果失效
+        self._config_version = 0
+        self._accounts_snapshot: Optional[Tuple[int, Dict[str, Dict[str, Any]]]] = None
         
         # 加载配置
         self._config = self._load_config()
@@ -39,8 +70,8 @@ class ConfigManager:
             with open(self.key_file, 'rb') as f:
                 return f.read()
         else:
-            # 生成新的加密密钥
-            key = Fernet.generate_key()
+            # 生成新的加密密钥（与Fernet密钥格式相同：32字节随机数的urlsafe base64）
+            key = base64.urlsafe_b64encode(os.urandom(32))
             with open(self.key_file, 'wb') as f:
                 f.write(key)
             # 设置文件权限，只有所有者可读写
@@ -68,8 +99,7 @@ class ConfigManager:
             return default_config
         
         try:
-            with open(self.config_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return load_json_bytes(self.config_file.read_bytes())
         except (json.JSONDecodeError, IOError) as e:
             logger.error(f"Failed to load config file: {e}")
             raise RuntimeError(f"无法加载配置文件: {e}")
@@ -78,27 +108,103 @@ class ConfigManager:
         """保存配置文件"""
         config_to_save = config or self._config
         try:
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(config_to_save, f, indent=2, ensure_ascii=False)
-            # 设置文件权限
-            os.chmod(self.config_file, 0o600)
+            self._atomic_write(self.config_file, dump_json_bytes(config_to_save))
+            self._invalidate_caches()
             logger.info("Configuration saved successfully")
         except IOError as e:
             logger.error(f"Failed to save config file: {e}")
             raise RuntimeError(f"无法保存配置文件: {e}")
     
+    def _get_box(self):
+        """获取SecretBox实例（XSalsa20-Poly1305，密钥由密钥文件派生）"""
+        if self._box is None:
+            import nacl.secret
+            raw_key = base64.urlsafe_b64decode(self._key)
+            box_key = hashlib.blake2b(raw_key, digest_size=32, person=b'binance-mcp').digest()
+            self._box = nacl.secret.SecretBox(box_key)
+        return self._box
+    
+    def _get_legacy_cipher(self):
+        """获取Fernet实例，仅用于解密旧版密文（延迟导入cryptography）"""
+        if self._legacy_cipher is None:
+            from cryptography.fernet import Fernet
+            self._legacy_cipher = Fernet(self._key)
+        return self._legacy_cipher
+    
+    def _decrypt_token(self, token: str) -> str:
+        """按密文格式选择SecretBox或旧版Fernet解密"""
+        if token.startswith(_BOX_TOKEN_PREFIX):
+            payload = base64.b64decode(token[len(_BOX_TOKEN_PREFIX):])
+            return self._get_box().decrypt(payload).decode()
+        return self._get_legacy_cipher().decrypt(token.encode()).decode()
+    
+    @staticmethod
+    def _atomic_write(path: Path, data: bytes) -> None:
+        """先写入同目录临时文件（权限0600）再原子替换，避免崩溃时留下半截文件"""
+        tmp_path = path.with_suffix(path.suffix + '.tmp')
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+    
+    def _invalidate_caches(self) -> None:
+        """配置变更后使缓存失效"""
+        self._config_version += 1
+        self._account_cache.clear()
+    
     def encrypt_value(self, value: str) -> str:
         """加密字符串值"""
-        return self._cipher.encrypt(value.encode()).decode()
+        encrypted = self._get_box().encrypt(value.encode())
+        return _BOX_TOKEN_PREFIX + base64.b64encode(encrypted).decode()
     
     def decrypt_value(self, encrypted_value: str) -> str:
-        """解密字符串值"""
+        """解密字符串值（兼容旧版Fernet密文）"""
         try:
-            return self._cipher.decrypt(encrypted_value.encode()).decode()
+            return self._decrypt_token(encrypted_value)
         except Exception as e:
             logger.error(f"Failed to decrypt value: {e}")
             raise RuntimeError(f"解密失败: {e}")
     
+    def _decrypt_account_fields(self, encrypted_account: Dict[str, Any]) -> Dict[str, str]:
+        """一次性解密账户的api_key和secret（兼容旧版Fernet密文，不修改配置）"""
+        try:
+            return {
+                field: self._decrypt_token(encrypted_account[field])
+                for field in ("api_key", "secret")
+            }
+        except Exception as e:
+            logger.error("Failed to decrypt value: %s", e)
+            raise RuntimeError(f"解密失败: {e}")
+    
+    def migrate_legacy_encryption(self) -> int:
+        """
+        将旧版Fernet密文重新加密为SecretBox密文并保存
+        
+        Returns:
+            升级的账户数量（没有旧版密文时不写文件，返回0）
+        """
+        migrated = 0
+        for account in self._config["accounts"].values():
+            legacy_fields = [
+                field for field in ("api_key", "secret")
+                if not account[field].startswith(_BOX_TOKEN_PREFIX)
+            ]
+            if not legacy_fields:
+                continue
+            decrypted = self._decrypt_account_fields(account)
+            for field in legacy_fields:
+                account[field] = self.encrypt_value(decrypted[field])
+            migrated += 1
+        
+        if migrated:
+            self._save_config()
+            logger.info("Migrated %d account(s) to SecretBox encryption", migrated)
+        return migrated
+    
     def add_account(
         self,
         account_id: str,
@@ -142,21 +248,36 @@ class ConfigManager:
         
         encrypted_account = self._config["accounts"][account_id]
         
+        # 密文未变化时直接返回缓存的解密结果
+        fingerprint = (encrypted_account["api_key"], encrypted_account["secret"])
+        cached = self._account_cache.get(account_id)
+        if cached is not None and cached[0] == fingerprint:
+            return dict(cached[1])
+        
         # 解密敏感信息，同时保留所有其他配置项
-        decrypted_account = {
-            "api_key": self.decrypt_value(encrypted_account["api_key"]),
-            "secret": self.decrypt_value(encrypted_account["secret"]),
-        }
+        decrypted_account = self._decrypt_account_fields(encrypted_account)
         
         # 复制所有非敏感配置项
         for key, value in encrypted_account.items():
             if key not in ["api_key", "secret"]:
                 decrypted_account[key] = value
         
-        return decrypted_account
+        self._account_cache[account_id] = (fingerprint, decrypted_account)
+        return dict(decrypted_account)
+    
+    def is_portfolio_margin(self, account_id: str) -> bool:
+        """账户是否启用统一账户模式（只读取非敏感字段，不解密凭证）"""
+        account = self._config["accounts"].get(account_id)
+        if account is None:
+            raise ValueError(f"账户 {account_id} 不存在")
+        return bool(account.get("portfolio_margin", False))
     
     def list_accounts(self) -> Dict[str, Dict[str, Any]]:
         """列出所有账户（不包含敏感信息）"""
+        snapshot = self._accounts_snapshot
+        if snapshot is not None and snapshot[0] == self._config_version:
+            return snapshot[1]
+        
         accounts = {}
         for account_id, account_data in self._config["accounts"].items():
             accounts[account_id] = {
@@ -164,8 +285,25 @@ class ConfigManager:
                 "sandbox": account_data["sandbox"],
                 "created_at": account_data.get("created_at", "")
             }
+        self._accounts_snapshot = (self._config_version, accounts)
         return accounts
     
+    def summarize_accounts(self) -> Dict[str, Dict[str, Any]]:
+        """
+        汇总所有账户状态（不解密任何凭证）
+        
+        valid仅表示api_key和secret均已配置，不校验其内容。
+        """
+        summary = {}
+        for account_id, account_data in self._config["accounts"].items():
+            summary[account_id] = {
+                "description": account_data.get("description", ""),
+                "sandbox": account_data.get("sandbox", False),
+                "valid": bool(account_data.get("api_key") and account_data.get("secret")),
+                "created_at": account_data.get("created_at", "")
+            }
+        return summary
+    
     def update_account(
         self,
         account_id: str,
@@ -274,6 +412,11 @@ class ConfigManager:
     
     def validate_account(self, account_id: str) -> bool:
         """验证账户配置是否有效"""
+        encrypted_account = self._config["accounts"].get(account_id, {})
+        # 密文缺失时无需解密即可判定无效
+        if not (encrypted_account.get("api_key") and encrypted_account.get("secret")):
+            return False
+        
         try:
             account = self.get_account(account_id)
             # 检查必要字段
@@ -292,7 +435,6 @@ class ConfigManager:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             backup_path = str(self.config_dir / f"config_backup_{timestamp}.json")
         
-        import shutil
-        shutil.copy2(self.config_file, backup_path)
+        self._atomic_write(Path(backup_path), self.config_file.read_bytes())
         logger.info(f"Config backed up to: {backup_path}")
         return backup_path
\ No newline at end of file
@@ -0,0 +1,35 @@
+"""
+事件循环配置模块
+
+可用时使用uvloop（libuv实现）替换默认的asyncio事件循环，
+CLI和服务器在调用asyncio.run之前都会调用install_uvloop()。
+"""
+
+import sys
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def install_uvloop() -> bool:
+    """
+    可用时启用uvloop事件循环（I/O吞吐高于默认selector循环）
+    
+    uvloop不支持Windows，未安装（pip install binance-mcp[fast]）时使用标准事件循环。
+    必须在asyncio.run之前调用，重复调用无副作用。
+    
+    Returns:
+        是否已启用uvloop
+    """
+    if sys.platform == 'win32':
+        return False
+    try:
+        import uvloop
+    except ImportError:
+        return False
+    
+    if not isinstance(asyncio.get_event_loop_policy(), uvloop.EventLoopPolicy):
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        logger.debug("已启用uvloop事件循环")
+    return True
@@ -0,0 +1,46 @@
+"""
+日志上下文模块
+
+为每次工具调用分配关联ID（correlation ID），通过contextvars在同一次调用的
+所有日志记录间传递，并发的工具调用互不干扰。
+"""
+
+import logging
+import uuid
+from contextvars import ContextVar, Token
+from typing import Optional
+
+_call_id: ContextVar[Optional[str]] = ContextVar('binance_mcp_call_id', default=None)
+
+
+def get_call_id() -> Optional[str]:
+    """获取当前工具调用的关联ID（不在工具调用中时为None）"""
+    return _call_id.get()
+
+
+def start_call() -> Optional[Token]:
+    """
+    为最外层的工具调用分配新的关联ID
+    
+    嵌套调用沿用外层ID，此时返回None。
+    
+    Returns:
+        用于end_call()恢复上下文的token
+    """
+    if _call_id.get() is not None:
+        return None
+    return _call_id.set(uuid.uuid4().hex[:12])
+
+
+def end_call(token: Optional[Token]) -> None:
+    """结束start_call()开始的工具调用"""
+    if token is not None:
+        _call_id.reset(token)
+
+
+class CallIdFilter(logging.Filter):
+    """为日志记录添加call_id字段（供格式串中的%(call_id)s使用）"""
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.call_id = _call_id.get() or '-'
+        return True
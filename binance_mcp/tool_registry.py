@@ -0,0 +1,336 @@
+"""
+MCP工具注册表
+
+所有MCP工具函数只在本模块定义一次（模块级async函数，显式参数，无**kwargs），
+完整版服务器与简化服务器从这里按需注册，避免两处重复维护。
+工具函数在调用时从上下文取得当前服务器的BinanceMCPTools实例。
+
+只转发参数的工具由_forward()按BinanceMCPTools方法的签名生成，签名与文档随方法同步；
+需要转换参数的工具在此手写。
+"""
+
+import inspect
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Dict, Any, Optional, List, Callable, Awaitable
+from fastmcp import FastMCP
+from fastmcp.tools import Tool
+
+from .tools import BinanceMCPTools
+
+# 当前服务器的工具实例；工具函数定义在模块级，调用时从上下文取得工具实例
+_tools_ctx: ContextVar[BinanceMCPTools] = ContextVar('binance_mcp_tools')
+
+
+def _current_tools() -> BinanceMCPTools:
+    """获取当前上下文绑定的工具实例"""
+    try:
+        return _tools_ctx.get()
+    except LookupError:
+        raise RuntimeError("MCP工具尚未绑定服务器实例")
+
+
+def _forward(name: str) -> Callable[..., Awaitable[Any]]:
+    """
+    按BinanceMCPTools方法生成同名的MCP工具函数
+    
+    生成的函数签名为方法去掉self和**params后的显式参数（FastMCP不支持**kwargs），
+    文档取自方法本身（去掉**params说明），调用时原样转发给当前绑定的工具实例。
+    
+    Args:
+        name: BinanceMCPTools的工具方法名
+        
+    Returns:
+        可注册到FastMCP的async函数
+    """
+    method = getattr(BinanceMCPTools, name)
+    signature = inspect.signature(method)
+    parameters = [
+        param for param in list(signature.parameters.values())[1:]
+        if param.kind is not inspect.Parameter.VAR_KEYWORD
+    ]
+    
+    async def tool(*args, **kwargs):
+        return await getattr(_current_tools(), name)(*args, **kwargs)
+    
+    tool.__name__ = tool.__qualname__ = name
+    tool.__module__ = __name__
+    tool.__doc__ = "\n".join(
+        line for line in (method.__doc__ or "").splitlines()
+        if not line.strip().startswith("**")
+    )
+    tool.__signature__ = signature.replace(parameters=parameters)
+    tool.__annotations__ = {
+        param.name: param.annotation for param in parameters
+        if param.annotation is not inspect.Parameter.empty
+    }
+    if signature.return_annotation is not inspect.Signature.empty:
+        tool.__annotations__['return'] = signature.return_annotation
+    return tool
+
+
+def _order_params(
+    time_in_force: Optional[str] = None,
+    reduce_only: bool = False,
+    extra: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """将显式的下单选项转换为ccxt的params（只包含调用方设置过的键）"""
+    params = dict(extra) if extra else {}
+    if time_in_force is not None:
+        params['timeInForce'] = time_in_force
+    if reduce_only:
+        params['reduceOnly'] = True
+    return params
+
+
+# ==================== 基础交易与查询工具 ====================
+
+
+async def create_spot_order(
+    account_id: str,
+    symbol: str,
+    side: str,
+    amount: float,
+    order_type: str = "limit",
+    price: Optional[float] = None,
+    time_in_force: Optional[str] = None,
+    extra: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    创建现货订单
+    
+    Args:
+        account_id: 账户ID
+        symbol: 交易对 (如 "BTC/USDT")
+        side: 买卖方向 ("buy" | "sell")
+        amount: 数量
+        order_type: 订单类型 ("limit" | "market")
+        price: 价格 (市价单可为None)
+        time_in_force: 有效方式 ("GTC" | "IOC" | "FOK")
+        extra: 其他Binance下单参数（可选）
+        
+    Returns:
+        订单信息字典
+    """
+    return await _current_tools().create_spot_order(
+        account_id, symbol, side, amount, order_type, price,
+        **_order_params(time_in_force, extra=extra)
+    )
+
+
+async def get_positions(account_id: str, symbol: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    获取持仓信息
+    
+    Args:
+        account_id: 账户ID
+        symbol: 可选的交易对过滤
+        
+    Returns:
+        持仓列表
+    """
+    return await _current_tools().get_positions(account_id, [symbol] if symbol else None)
+
+
+# 完整版服务器的get_positions保持原有的symbols列表参数（与简化服务器的单个symbol参数不同）
+get_positions_multi = _forward('get_positions')
+
+
+batch_create_orders = _forward('batch_create_orders')
+batch_cancel_orders = _forward('batch_cancel_orders')
+cancel_order = _forward('cancel_order')
+get_balance = _forward('get_balance')
+get_ticker = _forward('get_ticker')
+get_tickers = _forward('get_tickers')
+get_open_orders = _forward('get_open_orders')
+get_open_orders_multi = _forward('get_open_orders_multi')
+
+
+# ==================== 完整版服务器的额外工具 ====================
+
+
+async def create_futures_order(
+    account_id: str,
+    symbol: str,
+    side: str,
+    amount: float,
+    order_type: str = "limit",
+    price: Optional[float] = None,
+    time_in_force: Optional[str] = None,
+    reduce_only: bool = False,
+    extra: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    创建期货订单
+    
+    Args:
+        account_id: 账户ID
+        symbol: 交易对 (如 "BTC/USDT")
+        side: 买卖方向 ("buy" | "sell")
+        amount: 数量
+        order_type: 订单类型
+        price: 价格
+        time_in_force: 有效方式 ("GTC" | "IOC" | "FOK" | "GTX")
+        reduce_only: 是否只减仓
+        extra: 其他Binance下单参数（可选）
+        
+    Returns:
+        订单信息字典
+    """
+    return await _current_tools().create_futures_order(
+        account_id, symbol, side, amount, order_type, price,
+        **_order_params(time_in_force, reduce_only, extra)
+    )
+
+
+edit_order = _forward('edit_order')
+get_orders = _forward('get_orders')
+get_trades = _forward('get_trades')
+get_trading_fees = _forward('get_trading_fees')
+
+
+# ==================== 高级订单类型工具 ====================
+
+create_stop_loss_order = _forward('create_stop_loss_order')
+create_take_profit_order = _forward('create_take_profit_order')
+create_stop_limit_order = _forward('create_stop_limit_order')
+create_trailing_stop_order = _forward('create_trailing_stop_order')
+create_oco_order = _forward('create_oco_order')
+
+
+# ==================== 市场数据深度工具 ====================
+
+get_order_book = _forward('get_order_book')
+get_klines = _forward('get_klines')
+get_funding_rate = _forward('get_funding_rate')
+
+
+# ==================== 期权交易工具 ====================
+
+create_option_order = _forward('create_option_order')
+get_option_chain = _forward('get_option_chain')
+get_option_positions = _forward('get_option_positions')
+get_option_info = _forward('get_option_info')
+
+
+# ==================== 合约/期货交易工具 ====================
+
+create_contract_order = _forward('create_contract_order')
+close_position = _forward('close_position')
+get_futures_positions = _forward('get_futures_positions')
+
+
+# ==================== 完善的订单管理工具 ====================
+
+get_order_status = _forward('get_order_status')
+get_my_trades = _forward('get_my_trades')
+cancel_all_orders = _forward('cancel_all_orders')
+
+
+# ==================== 账户设置管理工具 ====================
+
+set_leverage = _forward('set_leverage')
+set_margin_mode = _forward('set_margin_mode')
+transfer_funds = _forward('transfer_funds')
+
+
+async def get_server_info() -> Dict[str, Any]:
+    """
+    获取服务器信息
+    
+    Returns:
+        服务器信息字典
+    """
+    # list_accounts()按配置版本缓存，这里只拼接账户相关的动态字段
+    accounts = _current_tools().config_manager.list_accounts()
+    return {
+        **_STATIC_SERVER_INFO,
+        "configured_accounts": len(accounts),
+        "accounts": list(accounts),
+    }
+
+
+# 简化服务器注册的工具
+CORE_TOOLS = [
+    create_spot_order,
+    cancel_order,
+    batch_create_orders,
+    batch_cancel_orders,
+    get_balance,
+    get_ticker,
+    get_tickers,
+    get_positions,
+    get_open_orders,
+    get_open_orders_multi,
+    create_stop_loss_order,
+    create_take_profit_order,
+    create_stop_limit_order,
+    create_trailing_stop_order,
+    create_oco_order,
+    get_order_book,
+    get_klines,
+    get_funding_rate,
+    create_option_order,
+    get_option_chain,
+    get_option_positions,
+    get_option_info,
+    create_contract_order,
+    close_position,
+    get_futures_positions,
+    get_order_status,
+    get_my_trades,
+    cancel_all_orders,
+    set_leverage,
+    set_margin_mode,
+    transfer_funds,
+    get_server_info,
+]
+
+
+# get_server_info中不随配置变化的字段（模块加载时构建一次）
+_STATIC_SERVER_INFO = {
+    "server_name": "binance-mcp",
+    "version": "1.0.0",
+    "supported_markets": ["spot", "futures", "options"],
+    "broker_ids": {
+        "spot": "C96E9MGA",
+        "futures": "eFC56vBf"
+    },
+    "total_tools": len(CORE_TOOLS),
+}
+
+# 简化服务器的工具信息（静态）
+CORE_TOOLS_INFO = {
+    "total_tools": len(CORE_TOOLS),
+    "tools": [tool.__name__ for tool in CORE_TOOLS],
+}
+
+
+# 完整版服务器按类别注册的工具
+TRADING_TOOLS = [
+    create_spot_order, create_futures_order, cancel_order, edit_order,
+    batch_create_orders, batch_cancel_orders,
+]
+QUERY_TOOLS = [
+    get_balance, get_positions_multi, get_orders, get_open_orders, get_open_orders_multi,
+    get_trades, get_trading_fees,
+]
+MARKET_DATA_TOOLS = [get_ticker, get_tickers, get_order_book, get_klines]
+SETTING_TOOLS = [set_leverage, set_margin_mode, transfer_funds]
+
+
+def bind_tools(tools: BinanceMCPTools) -> None:
+    """将工具实例绑定到当前上下文（之后创建的任务都会继承）"""
+    _tools_ctx.set(tools)
+
+
+@lru_cache(maxsize=None)
+def _build_tool(fn: Callable[..., Awaitable[Any]]) -> Tool:
+    """由工具函数生成FastMCP工具（参数schema只生成一次，各服务器实例共用）"""
+    return Tool.from_function(fn)
+
+
+def register_tools(mcp: FastMCP, tool_functions: List[Callable[..., Awaitable[Any]]]) -> None:
+    """将工具函数注册到FastMCP实例"""
+    for tool in tool_functions:
+        mcp.add_tool(_build_tool(tool))
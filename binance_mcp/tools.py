@@ -7,53 +7,602 @@ MCP工具实现模块
 - 市场数据工具（价格、深度、K线）
 - 设置管理工具（杠杆、保证金模式、转账）
 
-所有工具都直接基于ccxt进行封装，保持原始功能和错误信息。
+所有工具都直接基于ccxt异步接口（ccxt.async_support）进行封装，
+保持原始功能和错误信息。
 """
 
+import asyncio
+import base64
+import inspect
 import logging
-from typing import Dict, Any, Optional, List
-from functools import wraps
+import sys
+import threading
+import time
+from array import array
+from collections import deque
+from itertools import chain
+from typing import Dict, Any, Optional, List, Tuple, Callable, Awaitable, Union
+from functools import lru_cache, wraps
 import ccxt
+import ccxt.async_support as ccxt_async
 
 from .config import ConfigManager
 from .broker import exchange_factory
+from .log_context import start_call, end_call
 
 logger = logging.getLogger(__name__)
 
 
+# 删除交易对中'/'的转换表
+_STRIP_SLASH = str.maketrans('', '', '/')
+
+
+@lru_cache(maxsize=1024)
+def binance_symbol(symbol: str) -> str:
+    """
+    将ccxt统一交易对转换为Binance原生接口使用的交易对ID
+    
+    如 "BTC/USDT" -> "BTCUSDT"，"BTC/USDT:USDT" -> "BTCUSDT"；已是原生格式的原样返回。
+    交易对在调用间高度重复，结果按交易对缓存。
+    """
+    return symbol.partition(':')[0].translate(_STRIP_SLASH)
+
+
+# 下单参数的本地校验集合（大小写不敏感，与Binance订单类型一致）；
+# 明显无效的订单在本地即失败，不占用一次请求和请求权重
+ORDER_SIDES = frozenset({'buy', 'sell'})
+SPOT_ORDER_TYPES = frozenset({
+    'limit', 'market', 'limit_maker', 'stop_loss', 'stop_loss_limit', 'take_profit', 'take_profit_limit'
+})
+FUTURES_ORDER_TYPES = frozenset({
+    'limit', 'market', 'stop', 'stop_market', 'take_profit', 'take_profit_market', 'trailing_stop_market'
+})
+OPTION_ORDER_TYPES = frozenset({'limit', 'market'})
+# 各市场中必须指定价格的订单类型（现货TAKE_PROFIT/STOP_LOSS触发后为市价单，期货STOP/TAKE_PROFIT为限价单）
+PRICED_ORDER_TYPES = {
+    SPOT_ORDER_TYPES: frozenset({'limit', 'limit_maker', 'stop_loss_limit', 'take_profit_limit'}),
+    FUTURES_ORDER_TYPES: frozenset({'limit', 'stop', 'take_profit'}),
+    OPTION_ORDER_TYPES: frozenset({'limit'}),
+}
+
+# 统一账户双向持仓模式下，买卖方向对应的positionSide
+POSITION_SIDES = {'BUY': 'LONG', 'SELL': 'SHORT'}
+
+
+def validate_order(
+    side: str,
+    order_type: str,
+    amount: float,
+    price: Optional[float],
+    order_types: frozenset
+) -> None:
+    """
+    校验下单参数
+    
+    Raises:
+        ValueError: 买卖方向、订单类型、数量无效，或需要价格的订单类型缺少价格时
+    """
+    order_type_lower = order_type.lower()
+    if side.lower() not in ORDER_SIDES:
+        raise ValueError(f"无效的买卖方向: {side}（应为 buy 或 sell）")
+    if order_type_lower not in order_types:
+        raise ValueError(f"无效的订单类型: {order_type}（可选: {', '.join(sorted(order_types))}）")
+    if amount <= 0:
+        raise ValueError(f"下单数量必须大于0: {amount}")
+    if price is None and order_type_lower in PRICED_ORDER_TYPES[order_types]:
+        raise ValueError(f"{order_type}订单必须指定价格")
+
+
+class _ToolExecutionError(RuntimeError):
+    """handle_ccxt_error包装后的非ccxt错误；嵌套的工具调用原样向外传递，不重复包装"""
+
+
 def handle_ccxt_error(func):
     """
     装饰器：统一处理ccxt错误
     
-    保持原始错误类型和消息，添加MCP上下文信息用于调试
+    保持原始错误类型和消息，添加MCP上下文信息用于调试。
+    同时支持同步函数和协程函数。被装饰的BinanceMCPTools方法即为对外提供的工具。
     """
+    # 参数名只在装饰时解析一次；工具的参数多按位置传入，出错时才据此还原调用上下文
+    param_names = tuple(inspect.signature(func).parameters)
+    
+    def handle_error(e: Exception, args: tuple, kwargs: Dict[str, Any]) -> Exception:
+        if isinstance(e, ccxt.BaseError):
+            # 记录错误上下文用于调试（仅在出错且ERROR日志启用时构建，成功路径没有额外开销）
+            if logger.isEnabledFor(logging.ERROR):
+                call_args = dict(zip(param_names, args))
+                call_args.update(kwargs)
+                logger.error(
+                    "CCXT error in %s: account_id=%s symbol=%s error_type=%s error_message=%s",
+                    func.__name__, call_args.get('account_id'), call_args.get('symbol'), type(e).__name__, e
+                )
+            
+            # 直接重新抛出原始异常，保持ccxt的错误处理逻辑
+            return e
+        if isinstance(e, _ToolExecutionError):
+            return e
+        logger.error("Unexpected error in %s: %s", func.__name__, e)
+        return _ToolExecutionError(f"工具执行失败: {e}")
+    
+    if inspect.iscoroutinefunction(func):
+        @wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            # 每次工具调用分配关联ID，本次调用产生的日志都带有该ID
+            token = start_call()
+            try:
+                return await func(*args, **kwargs)
+            except Exception as e:
+                error = handle_error(e, args, kwargs)
+                if error is e:
+                    raise
+                raise error from e
+            finally:
+                end_call(token)
+        
+        async_wrapper._is_tool = True
+        return async_wrapper
+    
     @wraps(func)
     def wrapper(*args, **kwargs):
         try:
             return func(*args, **kwargs)
-        except ccxt.BaseError as e:
-            # 记录错误上下文用于调试
-            error_context = {
-                'tool_name': func.__name__,
-                'account_id': kwargs.get('account_id'),
-                'symbol': kwargs.get('symbol'),
-                'error_type': type(e).__name__,
-                'error_message': str(e)
-            }
-            logger.error(f"CCXT error in {func.__name__}: {error_context}")
-            
-            # 直接重新抛出原始异常，保持ccxt的错误处理逻辑
-            raise e
         except Exception as e:
-            logger.error(f"Unexpected error in {func.__name__}: {e}")
-            raise RuntimeError(f"工具执行失败: {e}")
+            error = handle_error(e, args, kwargs)
+            if error is e:
+                raise
+            raise error from e
+    
+    wrapper._is_tool = True
+    return wrapper
+
+
+OHLCV_COLUMNS = ('timestamp', 'open', 'high', 'low', 'close', 'volume')
+
+
+def pack_ohlcv(ohlcv: List[List]) -> Dict[str, Any]:
+    """
+    将ccxt的OHLCV列表打包为行优先的float64矩阵（base64编码的小端字节）
+    
+    还原：numpy.frombuffer(base64.b64decode(data_b64), '<f8').reshape(shape)。
+    缺失值（None）编码为NaN。
+    
+    Args:
+        ohlcv: [[timestamp, open, high, low, close, volume], ...]
+        
+    Returns:
+        {"columns", "shape", "dtype", "data_b64"}
+    """
+    values = array('d', (
+        float('nan') if value is None else value
+        for value in chain.from_iterable(row[:len(OHLCV_COLUMNS)] for row in ohlcv)
+    ))
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return {
+        "columns": list(OHLCV_COLUMNS),
+        "shape": [len(ohlcv), len(OHLCV_COLUMNS)],
+        "dtype": "<f8",
+        "data_b64": base64.b64encode(values.tobytes()).decode('ascii'),
+    }
+
+
+class OrderRateLimiter:
+    """
+    按账户的下单频率限制（滑动窗口）
+    
+    Binance对每个账户限制10秒内的下单数量，超限会返回429并可能封禁；
+    请求权重由ccxt内置限流器按端点计费，这里只补充ccxt未覆盖的下单数限制。
+    """
+    
+    def __init__(self, max_orders: int = 100, window: float = 10.0):
+        self.max_orders = max_orders
+        self.window = window
+        self._timestamps: Dict[str, deque] = {}
+    
+    async def acquire(self, account_id: str) -> None:
+        """等待直到该账户可以再下一单"""
+        timestamps = self._timestamps.setdefault(account_id, deque())
+        while True:
+            now = time.monotonic()
+            while timestamps and now - timestamps[0] >= self.window:
+                timestamps.popleft()
+            
+            # 检查与登记之间没有await，事件循环内无需加锁
+            if len(timestamps) < self.max_orders:
+                timestamps.append(now)
+                return
+            
+            await asyncio.sleep(self.window - (now - timestamps[0]))
+
+
+def order_rate_limited(func):
+    """装饰器：下单类工具在请求前占用账户的下单额度"""
+    @wraps(func)
+    async def wrapper(self, *args, **kwargs):
+        account_id = kwargs['account_id'] if 'account_id' in kwargs else args[0]
+        await self._order_limiter.acquire(account_id)
+        return await func(self, *args, **kwargs)
     
     return wrapper
 
 
+def rejected_order_error(exchange: ccxt_async.binance, order: Dict[str, Any]) -> Optional[ccxt.BaseError]:
+    """
+    检查batchOrders返回的单笔结果是否被拒绝
+    
+    批量下单时Binance对单笔失败的订单返回{code, msg}而不是整体报错，
+    ccxt解析为status为rejected的订单，不会抛出异常。
+    
+    Args:
+        exchange: 下单使用的exchange实例
+        order: create_orders返回的单笔订单
+        
+    Returns:
+        按Binance错误码映射的ccxt异常（与单笔下单时抛出的类型一致），订单未被拒绝时为None
+    """
+    info = order.get('info') or {}
+    if order.get('status') != 'rejected' and 'code' not in info:
+        return None
+    
+    code = str(info.get('code'))
+    message = f"{exchange.id} {info.get('msg', '')}"
+    exceptions = exchange.exceptions
+    for exact in (exceptions.get('linear', {}).get('exact', {}), exceptions.get('exact', {})):
+        error_class = exact.get(code)
+        if error_class is not None:
+            return error_class(message)
+    return ccxt.ExchangeError(message)
+
+
+def _track_task(tasks: set, coro: Awaitable[Any]) -> None:
+    """
+    在后台运行合批任务并持有其引用
+    
+    事件循环只保存任务的弱引用，不持有引用的任务可能在执行中被回收；
+    任务结束时移除引用，并记录未处理的异常。
+    """
+    task = asyncio.ensure_future(coro)
+    tasks.add(task)
+    
+    def done(task: asyncio.Future) -> None:
+        tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Batch task failed: %s", task.exception())
+    
+    task.add_done_callback(done)
+
+
+class FuturesOrderBatcher:
+    """
+    期货下单合批
+    
+    账户没有其他进行中的下单时立即单独发送，不增加延迟；
+    已有下单在进行中时（突发的多笔下单），后续订单在短时间窗口内合并为一次batchOrders请求
+    （Binance每批最多5单），按顺序把结果分发给各个调用方。
+    批量结果中被拒绝的订单对其调用方抛出对应的ccxt异常，与单独下单时一致。
+    订单格式同ccxt的create_orders：symbol, type, side, amount, price，可选params。
+    """
+    
+    MAX_BATCH_SIZE = 5
+    
+    def __init__(self, window: float = 0.010):
+        self.window = window
+        # {账户ID: [(exchange, 订单, Future), ...]}
+        self._queues: Dict[str, list] = {}
+        # 各账户立即发送、尚未返回的订单数
+        self._in_flight: Dict[str, int] = {}
+        # 进行中的发送任务
+        self._tasks: set = set()
+    
+    async def submit(
+        self,
+        account_id: str,
+        exchange: ccxt_async.binance,
+        order: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """下单：账户空闲时立即发送，否则加入待发送队列并等待该订单的下单结果"""
+        queue = self._queues.get(account_id)
+        if queue is None and not self._in_flight.get(account_id):
+            self._in_flight[account_id] = 1
+            try:
+                return await self._create_order(exchange, order)
+            finally:
+                remaining = self._in_flight.pop(account_id) - 1
+                if remaining:
+                    self._in_flight[account_id] = remaining
+        
+        future = asyncio.get_running_loop().create_future()
+        if queue is None:
+            queue = self._queues[account_id] = []
+            _track_task(self._tasks, self._flush(account_id))
+        queue.append((exchange, order, future))
+        return await future
+    
+    async def submit_all(
+        self,
+        account_id: str,
+        exchange: ccxt_async.binance,
+        orders: List[Dict[str, Any]]
+    ) -> List[Any]:
+        """
+        一次提交多笔订单（同一调用内的突发下单直接进入合批队列）
+        
+        Returns:
+            与orders顺序一致的下单结果，失败的订单为对应的异常对象
+        """
+        if len(orders) <= 1:
+            return list(await asyncio.gather(
+                *(self.submit(account_id, exchange, order) for order in orders),
+                return_exceptions=True
+            ))
+        
+        loop = asyncio.get_running_loop()
+        queue = self._queues.get(account_id)
+        if queue is None:
+            queue = self._queues[account_id] = []
+            _track_task(self._tasks, self._flush(account_id))
+        futures = []
+        for order in orders:
+            future = loop.create_future()
+            queue.append((exchange, order, future))
+            futures.append(future)
+        return list(await asyncio.gather(*futures, return_exceptions=True))
+    
+    @staticmethod
+    async def _create_order(exchange: ccxt_async.binance, order: Dict[str, Any]) -> Dict[str, Any]:
+        return await exchange.create_order(
+            order['symbol'], order['type'], order['side'],
+            order['amount'], order['price'], order.get('params', {})
+        )
+    
+    async def _flush(self, account_id: str) -> None:
+        await asyncio.sleep(self.window)
+        queue = self._queues.pop(account_id)
+        
+        for start in range(0, len(queue), self.MAX_BATCH_SIZE):
+            batch = queue[start:start + self.MAX_BATCH_SIZE]
+            exchange = batch[0][0]
+            try:
+                if len(batch) == 1:
+                    results = [await self._create_order(exchange, batch[0][1])]
+                else:
+                    results = await exchange.create_orders([order for _, order, _ in batch])
+            except Exception as e:
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            
+            for (_, _, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                error = rejected_order_error(exchange, result)
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(result)
+            
+            # 返回结果少于订单数时，缺少结果的订单不能当作成功
+            for _, _, future in batch[len(results):]:
+                if not future.done():
+                    future.set_exception(ccxt.ExchangeError("batchOrders返回的结果数量少于订单数"))
+
+
+class TickerBatcher:
+    """
+    行情查询合批
+    
+    短时间窗口内对同一exchange的get_ticker查询合并为一次fetch_tickers请求，
+    再按交易对把结果分发给各个调用方。
+    """
+    
+    MAX_BATCH_SIZE = 50
+    
+    def __init__(self, window: float = 0.005):
+        self.window = window
+        # {exchange: {交易对: Future}}
+        self._queues: Dict[Any, Dict[str, asyncio.Future]] = {}
+        # 进行中的发送任务
+        self._tasks: set = set()
+    
+    async def fetch(self, exchange: ccxt_async.binance, symbol: str) -> Dict[str, Any]:
+        """加入待发送队列并等待该交易对的行情"""
+        queue = self._queues.get(exchange)
+        if queue is None:
+            queue = self._queues[exchange] = {}
+            _track_task(self._tasks, self._flush(exchange))
+        
+        future = queue.get(symbol)
+        if future is None:
+            future = queue[symbol] = asyncio.get_running_loop().create_future()
+        return await asyncio.shield(future)
+    
+    async def _flush(self, exchange: ccxt_async.binance) -> None:
+        await asyncio.sleep(self.window)
+        queue = list(self._queues.pop(exchange).items())
+        
+        await asyncio.gather(*(
+            self._fetch_batch(exchange, queue[start:start + self.MAX_BATCH_SIZE])
+            for start in range(0, len(queue), self.MAX_BATCH_SIZE)
+        ))
+    
+    async def _fetch_batch(
+        self,
+        exchange: ccxt_async.binance,
+        batch: List[Tuple[str, asyncio.Future]]
+    ) -> None:
+        if len(batch) > 1:
+            try:
+                tickers = await exchange.fetch_tickers([symbol for symbol, _ in batch])
+            except Exception as e:
+                # 批量请求失败（如其中一个交易对无效）时逐个查询，各自返回自己的错误
+                logger.debug("fetch_tickers failed, falling back to fetch_ticker: %s", e)
+            else:
+                for symbol, future in batch:
+                    ticker = tickers.get(symbol) or tickers.get(exchange.market(symbol)['symbol'])
+                    if not future.done():
+                        future.set_result(ticker)
+                return
+        
+        results = await asyncio.gather(
+            *(exchange.fetch_ticker(symbol, {}) for symbol, _ in batch),
+            return_exceptions=True
+        )
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+class MarketDataStream:
+    """
+    行情websocket订阅（ccxt.pro，默认关闭）
+    
+    启用后（服务配置server.market_stream为true），被重复查询的行情在后台订阅websocket推送，
+    之后的查询直接读取内存中的最新数据，不再消耗REST请求权重；
+    未启用、未订阅、数据超过MAX_AGE未更新、订阅失败或ccxt.pro不可用时由调用方回退到REST。
+    价格行情每个环境只订阅一次全市场推送（!ticker@arr），维护所有交易对的最新行情表；
+    订单簿按交易对订阅。正式网与测试网使用各自的连接。
+    """
+    
+    # 同一行情被查询多少次后开始订阅
+    SUBSCRIBE_AFTER = 2
+    # 同时订阅的行情数上限
+    MAX_SUBSCRIPTIONS = 20
+    # 推送数据的最长使用时间（秒），超过后回退到REST（全市场推送只包含有变化的交易对）
+    MAX_AGE = {'ticker': 2.0, 'order_book': 1.0}
+    
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        # {是否测试网: ccxt.pro exchange}
+        self._exchanges: Dict[bool, Any] = {}
+        # {(数据类型, 交易对或'*', 是否测试网): 最新数据}
+        self._latest: Dict[Tuple[str, str, bool], Any] = {}
+        # {(数据类型, 交易对, 是否测试网): 收到推送的time.monotonic()时刻}
+        self._received: Dict[Tuple[str, str, bool], float] = {}
+        self._tasks: Dict[Tuple[str, str, bool], asyncio.Task] = {}
+        self._query_counts: Dict[Tuple[str, str, bool], int] = {}
+    
+    def get(self, kind: str, symbol: str, sandbox: bool = False) -> Optional[Any]:
+        """
+        读取订阅到的最新行情
+        
+        Args:
+            kind: 数据类型 ("ticker" | "order_book")
+            symbol: 交易对
+            sandbox: 是否使用测试网
+            
+        Returns:
+            最新行情；未订阅（达到查询次数后在后台开始订阅）或数据已过期时返回None
+        """
+        key = (kind, symbol, sandbox)
+        watch_key = ('ticker', '*', sandbox) if kind == 'ticker' else key
+        data = self._latest.get(watch_key)
+        if data is not None:
+            if kind == 'ticker':
+                # 行情表以统一交易对（BTC/USDT）为键，兼容传入交易所ID（BTCUSDT）
+                if symbol not in data:
+                    symbol = self._exchanges[sandbox].safe_symbol(symbol)
+                data = data.get(symbol)
+            received = self._received.get((kind, symbol, sandbox))
+            if data is not None and received is not None and time.monotonic() - received <= self.MAX_AGE[kind]:
+                return data
+            return None
+        
+        if not self.enabled or watch_key in self._tasks or len(self._tasks) >= self.MAX_SUBSCRIPTIONS:
+            return None
+        
+        count = self._query_counts[key] = self._query_counts.get(key, 0) + 1
+        if count >= self.SUBSCRIBE_AFTER:
+            self._tasks[watch_key] = asyncio.ensure_future(self._watch(watch_key))
+        return None
+    
+    def _get_exchange(self, sandbox: bool):
+        exchange = self._exchanges.get(sandbox)
+        if exchange is None:
+            import ccxt.pro as ccxt_pro
+            
+            exchange = self._exchanges[sandbox] = ccxt_pro.binance({'enableRateLimit': True})
+            if sandbox:
+                exchange.set_sandbox_mode(True)
+        return exchange
+    
+    async def _watch(self, key: Tuple[str, str, bool]) -> None:
+        kind, symbol, sandbox = key
+        try:
+            exchange = self._get_exchange(sandbox)
+            if symbol == '*':
+                while True:
+                    # 每条推送只包含有变化的交易对，完整的行情表由ccxt维护在exchange.tickers
+                    changed = await exchange.watch_tickers()
+                    now = time.monotonic()
+                    for changed_symbol in changed:
+                        self._received[('ticker', changed_symbol, sandbox)] = now
+                    self._latest[key] = exchange.tickers
+            else:
+                while True:
+                    self._latest[key] = await exchange.watch_order_book(symbol)
+                    self._received[key] = time.monotonic()
+        except ImportError:
+            logger.info("ccxt.pro不可用，行情查询使用REST接口")
+            self.enabled = False
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("Websocket subscription %s %s stopped: %s", kind, symbol, e)
+        finally:
+            self._latest.pop(key, None)
+            self._tasks.pop(key, None)
+            # 订阅结束后重新累计查询次数
+            if symbol == '*':
+                self._received = {k: v for k, v in self._received.items() if k[0] != 'ticker' or k[2] != sandbox}
+                self._query_counts = {
+                    k: v for k, v in self._query_counts.items() if k[0] != 'ticker' or k[2] != sandbox
+                }
+            else:
+                self._received.pop(key, None)
+                self._query_counts.pop(key, None)
+    
+    async def close(self) -> None:
+        """取消所有订阅并关闭websocket连接"""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        
+        exchanges = list(self._exchanges.values())
+        self._exchanges.clear()
+        for exchange in exchanges:
+            await exchange.close()
+
+
 class BinanceMCPTools:
     """Binance MCP工具集合"""
     
+    # 行情数据缓存有效期（秒），同一参数的重复查询在有效期内不再请求Binance
+    # K线的有效期按周期计算（周期的1/4），这里是其上限，避免日线等长周期的最新K线长时间不更新
+    MARKET_DATA_TTL = {
+        'ticker': 0.5,
+        'order_book': 0.2,
+        'klines': 60.0,
+        'funding_rate': 30.0,
+        'trading_fees': 3600.0,
+    }
+    
+    # 多交易对查询的最大并发请求数
+    MULTI_SYMBOL_CONCURRENCY = 20
+    
+    # 后台重新加载市场列表的间隔（秒），新上线的交易对无需重启服务即可使用
+    MARKETS_REFRESH_INTERVAL = 3600.0
+    
+    # 工具参数中的账户/合约类型 -> exchange实例的市场类型（未列出的取默认值）
+    BALANCE_MARKET_TYPES = {'spot': 'spot', 'future': 'future', 'option': 'option'}
+    CONTRACT_MARKET_TYPES = {'future': 'future', 'delivery': 'delivery'}
+    
     def __init__(self, config_manager: ConfigManager):
         """
         初始化MCP工具
@@ -62,56 +611,180 @@ class BinanceMCPTools:
             config_manager: 配置管理器实例
         """
         self.config_manager = config_manager
-        self._exchange_cache = {}  # 缓存exchange实例
+        # 缓存exchange实例 {(账户ID, 市场类型或'spot_only'): exchange}，读取不加锁，未命中时加锁创建
+        self._exchange_cache: Dict[Tuple[str, str], ccxt_async.binance] = {}
+        self._cache_lock = threading.Lock()
+        # 行情数据缓存 {(数据类型, 参数...): (写入时间, 数据)}
+        self._market_data_cache: Dict[Tuple, Tuple[float, Any]] = {}
+        self._order_limiter = OrderRateLimiter()
+        # 进行中的行情请求 {缓存键: Future}，相同查询共享同一次请求
+        self._inflight_market_data: Dict[Tuple, asyncio.Future] = {}
+        self._futures_batcher = FuturesOrderBatcher()
+        # 行情websocket订阅默认关闭，服务配置server.market_stream为true时启用
+        self._market_stream = MarketDataStream(
+            enabled=bool(config_manager.get_server_config().get('market_stream', False))
+        )
+        self._ticker_batcher = TickerBatcher()
+        self._preload_task: Optional[asyncio.Task] = None
+        # 公共行情使用的环境 (账户列表快照, 是否沙盒)，账户列表变化时重新判断
+        self._market_sandbox: Optional[Tuple[Dict[str, Any], bool]] = None
+    
+    def _get_market_sandbox(self) -> bool:
+        """
+        判断公共行情查询使用的环境：与第一个配置的账户一致，未配置账户时使用正式网
+        
+        list_accounts()在配置未变更时返回同一个快照对象，据此判断是否需要重新计算。
+        """
+        accounts = self.config_manager.list_accounts()
+        cached = self._market_sandbox
+        if cached is not None and cached[0] is accounts:
+            return cached[1]
+        
+        sandbox = bool(accounts[next(iter(accounts))].get('sandbox', False)) if accounts else False
+        self._market_sandbox = (accounts, sandbox)
+        return sandbox
+    
+    def _get_public_exchange(self, market_type: str = 'spot') -> ccxt_async.binance:
+        """
+        获取公共行情查询使用的exchange实例（不带凭证，不需要配置账户）
+        
+        Args:
+            market_type: ccxt defaultType (spot, future, delivery, option)
+            
+        Returns:
+            ccxt.async_support.binance实例
+        """
+        return exchange_factory.create_public_exchange(self._get_market_sandbox(), market_type)
+    
+    def _get_exchange(self, account_id: str, market_type: str = 'spot') -> ccxt_async.binance:
+        """
+        获取指定账户、指定市场类型的exchange实例（带缓存）
+        
+        每个市场类型使用独立实例，defaultType在创建时确定，调用时不再修改，
+        同一账户的现货与期货请求可以安全地并发执行。
+        
+        Args:
+            account_id: 账户ID
+            market_type: ccxt defaultType (spot, future, delivery, option)
+            
+        Returns:
+            ccxt.async_support.binance实例
+            
+        Raises:
+            ValueError: 账户不存在时
+        """
+        key = (account_id, market_type)
+        exchange = self._exchange_cache.get(key)
+        if exchange is not None:
+            return exchange
+        
+        # 双重检查：并发的未命中只有一个线程创建实例
+        with self._cache_lock:
+            exchange = self._exchange_cache.get(key)
+            if exchange is None:
+                account_config = self.config_manager.get_account(account_id)
+                exchange = exchange_factory.create_exchange(account_config, market_type)
+                self._exchange_cache[key] = exchange
+        
+        return exchange
     
-    def _get_exchange(self, account_id: str) -> ccxt.binance:
+    def _get_spot_only_exchange(self, account_id: str) -> ccxt_async.binance:
         """
-        获取指定账户的exchange实例（带缓存）
+        获取指定账户的现货专用exchange实例（带缓存，用于统一账户的现货余额与转账）
+        
+        缓存后不再每次调用都解密账户配置、复制配置并查询工厂缓存。
         
         Args:
             account_id: 账户ID
             
         Returns:
-            ccxt.binance实例
+            不使用portfolioMargin配置的ccxt.async_support.binance实例
             
         Raises:
             ValueError: 账户不存在时
         """
-        if account_id not in self._exchange_cache:
-            account_config = self.config_manager.get_account(account_id)
-            exchange = exchange_factory.create_exchange(account_config)
-            self._exchange_cache[account_id] = exchange
+        key = (account_id, 'spot_only')
+        exchange = self._exchange_cache.get(key)
+        if exchange is not None:
+            return exchange
+        
+        with self._cache_lock:
+            exchange = self._exchange_cache.get(key)
+            if exchange is None:
+                exchange = self._create_spot_only_exchange(self.config_manager.get_account(account_id))
+                self._exchange_cache[key] = exchange
         
-        return self._exchange_cache[account_id]
+        return exchange
     
-    def _create_spot_only_exchange(self, account_config: Dict[str, Any]) -> ccxt.binance:
+    def _create_spot_only_exchange(self, account_config: Dict[str, Any]) -> ccxt_async.binance:
         """
-        创建专门用于现货的exchange实例（不使用portfolioMargin配置）
+        获取专门用于现货的exchange实例（不使用portfolioMargin配置）
+        
+        实例由工厂按凭证缓存，重复调用复用同一个HTTP会话。
         
         Args:
             account_config: 账户配置
             
         Returns:
-            专门用于现货的ccxt.binance实例
-        """
-        return ccxt.binance({
-            'apiKey': account_config['api_key'],
-            'secret': account_config['secret'],
-            'sandbox': account_config.get('sandbox', False),
-            'enableRateLimit': True,
-            'options': {
-                'defaultType': 'spot',
-                'broker': {
-                    'spot': 'C96E9MGA',  # 现货broker ID
-                },
-                # 重要：不设置portfolioMargin，让现货使用标准API
-            }
-        })
+            专门用于现货的ccxt.async_support.binance实例
+        """
+        # 重要：不设置portfolioMargin，让现货使用标准API
+        spot_config = {**account_config, 'portfolio_margin': False}
+        return exchange_factory.create_exchange(spot_config, 'spot')
+    
+    async def _cached_market_data(
+        self,
+        cache_key: Tuple,
+        fetch: Callable[[], Awaitable[Any]],
+        params: Dict[str, Any],
+        ttl: Optional[float] = None
+    ) -> Any:
+        """
+        带TTL缓存的行情查询
+        
+        缓存未命中时，同一参数的并发查询共享同一次请求。
+        
+        Args:
+            cache_key: (数据类型, 查询参数...)，数据类型对应MARKET_DATA_TTL的键
+            fetch: 缓存未命中时调用的查询协程函数
+            params: 透传给ccxt的额外参数，非空时不走缓存
+            ttl: 缓存有效期（秒），默认取MARKET_DATA_TTL中数据类型对应的值；
+                为0时不读缓存（仍与进行中的相同查询共享请求，并刷新缓存）
+            
+        Returns:
+            行情数据（缓存命中时与上次返回的是同一对象）
+        """
+        if params:
+            return await fetch()
+        
+        if ttl is None:
+            ttl = self.MARKET_DATA_TTL[cache_key[0]]
+        
+        now = time.monotonic()
+        entry = self._market_data_cache.get(cache_key)
+        if entry is not None and now - entry[0] < ttl:
+            return entry[1]
+        
+        # 检查与登记之间没有await，事件循环内无需加锁
+        future = self._inflight_market_data.get(cache_key)
+        if future is None:
+            future = asyncio.ensure_future(self._fetch_market_data(cache_key, fetch))
+            self._inflight_market_data[cache_key] = future
+            future.add_done_callback(lambda _: self._inflight_market_data.pop(cache_key, None))
+        
+        return await asyncio.shield(future)
+    
+    async def _fetch_market_data(self, cache_key: Tuple, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """请求行情数据并写入缓存"""
+        data = await fetch()
+        self._market_data_cache[cache_key] = (time.monotonic(), data)
+        return data
     
     # ==================== 交易操作工具 ====================
     
     @handle_ccxt_error
-    def create_spot_order(
+    @order_rate_limited
+    async def create_spot_order(
         self,
         account_id: str,
         symbol: str,
@@ -129,22 +802,55 @@ class BinanceMCPTools:
             symbol: 交易对 (如 "BTC/USDT")
             side: 买卖方向 ("buy" | "sell")
             amount: 数量
-            order_type: 订单类型 ("limit" | "market" | "stop_limit" 等)
+            order_type: 订单类型 ("limit" | "market" | "stop_loss_limit" 等)
             price: 价格 (市价单可为None)
             **params: 其他参数透传给ccxt
             
         Returns:
             订单信息字典
         """
+        validate_order(side, order_type, amount, price, SPOT_ORDER_TYPES)
+        exchange = self._get_exchange(account_id, 'spot')
+        return await exchange.create_order(symbol, order_type, side, amount, price, params)
+    
+    async def _create_um_order(
+        self,
+        account_id: str,
+        symbol: str,
+        side: str,
+        order_type: str,
+        amount: float,
+        price: Optional[float],
+        params: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        统一账户通过Portfolio Margin API下U本位合约单
+        
+        默认按双向持仓开仓设置positionSide，params中的positionSide等字段优先。
+        """
+        # 统一账户的papi请求使用带portfolioMargin配置的默认实例
         exchange = self._get_exchange(account_id)
+        side_upper = side.upper()
+        type_upper = order_type.upper()
         
-        # 确保在现货市场
-        exchange.options['defaultType'] = 'spot'
+        order_params = {
+            'symbol': binance_symbol(symbol),
+            'side': side_upper,
+            'type': type_upper,
+            'quantity': amount,
+            'positionSide': POSITION_SIDES[side_upper]  # 双向持仓模式必需
+        }
+        
+        if type_upper != 'MARKET' and price is not None:
+            order_params['price'] = price
+        
+        order_params.update(params)
         
-        return exchange.create_order(symbol, order_type, side, amount, price, params)
+        return await exchange.papiPostUmOrder(order_params)
     
-    @handle_ccxt_error 
-    def create_futures_order(
+    @handle_ccxt_error
+    @order_rate_limited
+    async def create_futures_order(
         self,
         account_id: str,
         symbol: str,
@@ -169,38 +875,31 @@ class BinanceMCPTools:
         Returns:
             订单信息字典
         """
-        exchange = self._get_exchange(account_id)
+        validate_order(side, order_type, amount, price, FUTURES_ORDER_TYPES)
         
         # 检查是否为统一账户模式
-        account_config = self.config_manager.get_account(account_id)
-        is_portfolio_margin = account_config.get('portfolio_margin', False)
+        is_portfolio_margin = self.config_manager.is_portfolio_margin(account_id)
         
         if is_portfolio_margin:
             # 统一账户模式：使用Portfolio Margin API
-            # 双向持仓模式需要指定positionSide
-            position_side = 'LONG' if side.upper() == 'BUY' else 'SHORT'
-            
-            order_params = {
-                'symbol': symbol.replace('/', ''),
-                'side': side.upper(),
-                'type': order_type.upper(),
-                'quantity': amount,
-                'positionSide': position_side  # 双向持仓模式必需
-            }
-            
-            if order_type != "market" and price is not None:
-                order_params['price'] = price
-                
-            order_params.update(params)
-            
-            return exchange.papiPostUmOrder(order_params)
+            return await self._create_um_order(account_id, symbol, side, order_type, amount, price, params)
         else:
             # 普通账户模式：使用原有逻辑
-            exchange.options['defaultType'] = 'future'
-            return exchange.create_order(symbol, order_type, side, amount, price, params)
+            exchange = self._get_exchange(account_id, 'future')
+            if params:
+                # 带额外参数的订单（条件单等）不支持批量下单，单独发送
+                return await exchange.create_order(symbol, order_type, side, amount, price, params)
+            
+            return await self._futures_batcher.submit(account_id, exchange, {
+                'symbol': symbol,
+                'type': order_type,
+                'side': side,
+                'amount': amount,
+                'price': price,
+            })
     
     @handle_ccxt_error
-    def cancel_order(
+    async def cancel_order(
         self,
         account_id: str,
         order_id: str,
@@ -220,10 +919,119 @@ class BinanceMCPTools:
             取消结果
         """
         exchange = self._get_exchange(account_id)
-        return exchange.cancel_order(order_id, symbol, params)
+        return await exchange.cancel_order(order_id, symbol, params)
     
     @handle_ccxt_error
-    def edit_order(
+    async def batch_create_orders(
+        self,
+        account_id: str,
+        orders: List[Dict[str, Any]],
+        market_type: str = "future"
+    ) -> List[Dict[str, Any]]:
+        """
+        批量创建订单
+        
+        期货订单按Binance批量下单接口（batchOrders，每批最多5单）合并发送；
+        现货没有批量接口，统一账户期货走papi，这两种情况并发逐单下单。
+        未指定type的订单按限价单处理。
+        
+        单笔订单失败不影响其他订单：对应位置返回status为rejected的条目
+        （symbol, side, amount, error_type, error），全部失败时抛出第一个错误。
+        
+        Args:
+            account_id: 账户ID
+            orders: 订单列表，每项包含symbol, side, amount，可选type（默认limit）、price和params
+            market_type: 市场类型 ("future" | "spot")
+            
+        Returns:
+            与orders顺序一致的订单信息列表（被拒绝的订单为rejected条目）
+        """
+        orders = [{**order, 'type': order.get('type', 'limit')} for order in orders]
+        
+        if market_type == "spot" or self.config_manager.is_portfolio_margin(account_id):
+            create = self.create_spot_order if market_type == "spot" else self.create_futures_order
+            results = await asyncio.gather(*(
+                create(
+                    account_id, order['symbol'], order['side'], order['amount'],
+                    order['type'], order.get('price'), **order.get('params', {})
+                )
+                for order in orders
+            ), return_exceptions=True)
+        else:
+            for order in orders:
+                validate_order(order['side'], order['type'], order['amount'], order.get('price'), FUTURES_ORDER_TYPES)
+            for _ in orders:
+                await self._order_limiter.acquire(account_id)
+            
+            exchange = self._get_exchange(account_id, 'future')
+            
+            async def create_batch(batch: List[Dict[str, Any]]) -> List[Any]:
+                # 整批请求失败时该批每笔订单都记为失败，不影响其他批次
+                try:
+                    created = await exchange.create_orders(batch)
+                except Exception as e:
+                    return [e] * len(batch)
+                return [rejected_order_error(exchange, result) or result for result in created]
+            
+            size = FuturesOrderBatcher.MAX_BATCH_SIZE
+            batches = await asyncio.gather(*(
+                create_batch(orders[start:start + size])
+                for start in range(0, len(orders), size)
+            ))
+            results = [result for batch in batches for result in batch]
+        
+        errors = [result for result in results if isinstance(result, Exception)]
+        if errors and len(errors) == len(results):
+            raise errors[0]
+        
+        return [
+            {
+                'status': 'rejected',
+                'symbol': order['symbol'],
+                'side': order['side'],
+                'amount': order['amount'],
+                'error_type': type(result).__name__,
+                'error': str(result),
+            } if isinstance(result, Exception) else result
+            for order, result in zip(orders, results)
+        ]
+    
+    @handle_ccxt_error
+    async def batch_cancel_orders(
+        self,
+        account_id: str,
+        symbol: str,
+        order_ids: List[str],
+        market_type: str = "future"
+    ) -> List[Dict[str, Any]]:
+        """
+        批量取消订单
+        
+        Args:
+            account_id: 账户ID
+            symbol: 交易对
+            order_ids: 订单ID列表
+            market_type: 市场类型 ("future" | "spot")，现货没有批量接口时并发逐单取消
+            
+        Returns:
+            取消结果列表
+        """
+        exchange = self._get_exchange(account_id, market_type)
+        if market_type == "spot":
+            return list(await asyncio.gather(*(
+                exchange.cancel_order(order_id, symbol) for order_id in order_ids
+            )))
+        
+        # Binance期货批量撤单每次最多10个订单
+        batches = await asyncio.gather(*(
+            exchange.cancel_orders(order_ids[start:start + 10], symbol)
+            for start in range(0, len(order_ids), 10)
+        ))
+        return [order for batch in batches for order in batch]
+    
+    @handle_ccxt_error
+    @order_rate_limited
+    async def edit_order(
         self,
         account_id: str,
         order_id: str,
@@ -251,12 +1059,12 @@ class BinanceMCPTools:
             修改后的订单信息
         """
         exchange = self._get_exchange(account_id)
-        return exchange.edit_order(order_id, symbol, order_type, side, amount, price, params)
+        return await exchange.edit_order(order_id, symbol, order_type, side, amount, price, params)
     
     # ==================== 账户查询工具 ====================
     
     @handle_ccxt_error
-    def get_balance(
+    async def get_balance(
         self,
         account_id: str,
         account_type: str = "spot",
@@ -276,60 +1084,57 @@ class BinanceMCPTools:
         exchange = self._get_exchange(account_id)
         
         # 检查是否为统一账户模式
-        account_config = self.config_manager.get_account(account_id)
-        is_portfolio_margin = account_config.get('portfolio_margin', False)
+        is_portfolio_margin = self.config_manager.is_portfolio_margin(account_id)
         
         if is_portfolio_margin:
             # 统一账户模式下的逻辑
             if account_type in ["future", "option", "margin"]:
                 # 衍生品账户：使用Portfolio Margin API
-                balance_data = exchange.papi_get_balance(params)
+                balance_data = await exchange.papi_get_balance(params)
                 
                 # 将Portfolio Margin API格式转换为ccxt标准格式
                 if isinstance(balance_data, list):
+                    # 资产可能有数百行，循环内使用局部名称，省去重复的全局与属性查找
                     result = {}
+                    to_float = float
                     for asset in balance_data:
-                        currency = asset.get('asset')
-                        if currency:
-                            # 统一账户的总可用余额 = 杠杆可用 + 期货余额
-                            cross_margin_free = float(asset.get('crossMarginFree', 0))
-                            um_wallet_balance = float(asset.get('umWalletBalance', 0)) 
-                            cm_wallet_balance = float(asset.get('cmWalletBalance', 0))
-                            
-                            total_available = cross_margin_free + um_wallet_balance + cm_wallet_balance
-                            total_wallet_balance = float(asset.get('totalWalletBalance', 0))
-                            
-                            result[currency] = {
-                                'free': total_available,
-                                'used': max(0, total_wallet_balance - total_available),
-                                'total': total_wallet_balance,
-                                # 额外信息用于调试
-                                'crossMarginFree': cross_margin_free,
-                                'umWalletBalance': um_wallet_balance,
-                                'cmWalletBalance': cm_wallet_balance
-                            }
+                        get = asset.get
+                        currency = get('asset')
+                        if not currency:
+                            continue
+                        # 统一账户的总可用余额 = 杠杆可用 + 期货余额
+                        cross_margin_free = to_float(get('crossMarginFree', 0))
+                        um_wallet_balance = to_float(get('umWalletBalance', 0))
+                        cm_wallet_balance = to_float(get('cmWalletBalance', 0))
+                        
+                        total_available = cross_margin_free + um_wallet_balance + cm_wallet_balance
+                        total_wallet_balance = to_float(get('totalWalletBalance', 0))
+                        used = total_wallet_balance - total_available
+                        
+                        result[currency] = {
+                            'free': total_available,
+                            'used': used if used > 0 else 0,
+                            'total': total_wallet_balance,
+                            # 额外信息用于调试
+                            'crossMarginFree': cross_margin_free,
+                            'umWalletBalance': um_wallet_balance,
+                            'cmWalletBalance': cm_wallet_balance
+                        }
                     return result
                 else:
                     return balance_data
             else:
                 # 现货账户：即使在统一账户模式下，现货账户仍然是独立的
                 # 创建一个专门的现货exchange（不使用portfolioMargin配置）
-                account_config = self.config_manager.get_account(account_id)
-                spot_exchange = self._create_spot_only_exchange(account_config)
-                return spot_exchange.fetch_balance(params)
+                spot_exchange = self._get_spot_only_exchange(account_id)
+                return await spot_exchange.fetch_balance(params)
         else:
             # 普通账户模式：使用原有逻辑
-            if account_type == "future":
-                exchange.options['defaultType'] = 'future'
-            elif account_type == "option":
-                exchange.options['defaultType'] = 'option'
-            else:
-                exchange.options['defaultType'] = 'spot'
-            
-            return exchange.fetch_balance(params)
+            market_type = self.BALANCE_MARKET_TYPES.get(account_type, 'spot')
+            return await self._get_exchange(account_id, market_type).fetch_balance(params)
     
     @handle_ccxt_error
-    def get_positions(
+    async def get_positions(
         self,
         account_id: str,
         symbols: Optional[List[str]] = None,
@@ -346,11 +1151,11 @@ class BinanceMCPTools:
         Returns:
             持仓信息列表
         """
-        exchange = self._get_exchange(account_id)
-        return exchange.fetch_positions(symbols, params)
+        exchange = self._get_exchange(account_id, 'future')
+        return await exchange.fetch_positions(symbols, params)
     
     @handle_ccxt_error
-    def get_orders(
+    async def get_orders(
         self,
         account_id: str,
         symbol: Optional[str] = None,
@@ -372,10 +1177,10 @@ class BinanceMCPTools:
             订单列表
         """
         exchange = self._get_exchange(account_id)
-        return exchange.fetch_orders(symbol, since, limit, params)
+        return await exchange.fetch_orders(symbol, since, limit, params)
     
     @handle_ccxt_error
-    def get_open_orders(
+    async def get_open_orders(
         self,
         account_id: str,
         symbol: Optional[str] = None,
@@ -393,10 +1198,37 @@ class BinanceMCPTools:
             开放订单列表
         """
         exchange = self._get_exchange(account_id)
-        return exchange.fetch_open_orders(symbol, params)
+        return await exchange.fetch_open_orders(symbol, params)
+    
+    @handle_ccxt_error
+    async def get_open_orders_multi(
+        self,
+        account_id: str,
+        symbols: List[str]
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        并发查询多个交易对的开放订单
+        
+        Args:
+            account_id: 账户ID
+            symbols: 交易对列表
+            
+        Returns:
+            {交易对: 开放订单列表}
+        """
+        exchange = self._get_exchange(account_id)
+        # 限制同时进行的请求数，请求权重仍由ccxt限流器计费
+        semaphore = asyncio.Semaphore(self.MULTI_SYMBOL_CONCURRENCY)
+        
+        async def fetch(symbol: str) -> List[Dict[str, Any]]:
+            async with semaphore:
+                return await exchange.fetch_open_orders(symbol)
+        
+        results = await asyncio.gather(*(fetch(symbol) for symbol in symbols))
+        return dict(zip(symbols, results))
     
     @handle_ccxt_error
-    def get_trades(
+    async def get_trades(
         self,
         account_id: str,
         symbol: Optional[str] = None,
@@ -418,14 +1250,15 @@ class BinanceMCPTools:
             交易记录列表
         """
         exchange = self._get_exchange(account_id)
-        return exchange.fetch_my_trades(symbol, since, limit, params)
+        return await exchange.fetch_my_trades(symbol, since, limit, params)
     
     # ==================== 市场数据工具 ====================
     
     @handle_ccxt_error
-    def get_ticker(
+    async def get_ticker(
         self,
         symbol: str,
+        no_cache: bool = False,
         **params
     ) -> Dict[str, Any]:
         """
@@ -433,26 +1266,59 @@ class BinanceMCPTools:
         
         Args:
             symbol: 交易对
+            no_cache: 为True时跳过TTL缓存与websocket推送，向Binance请求最新数据
             **params: 其他参数
             
         Returns:
             价格数据字典
         """
-        # 市场数据不需要特定账户，使用任意配置的账户
-        accounts = self.config_manager.list_accounts()
-        if not accounts:
-            raise ValueError("未配置任何账户")
+        if not params and not no_cache:
+            ticker = self._market_stream.get('ticker', symbol, self._get_market_sandbox())
+            if ticker is not None:
+                return ticker
         
-        account_id = next(iter(accounts.keys()))
-        exchange = self._get_exchange(account_id)
+        exchange = self._get_public_exchange()
         
-        return exchange.fetch_ticker(symbol, params)
+        if params:
+            fetch = lambda: exchange.fetch_ticker(symbol, params)
+        else:
+            # 并发查询不同交易对时合并为一次fetch_tickers请求
+            fetch = lambda: self._ticker_batcher.fetch(exchange, symbol)
+        
+        return await self._cached_market_data(('ticker', symbol), fetch, params, 0.0 if no_cache else None)
     
     @handle_ccxt_error
-    def get_order_book(
+    async def get_tickers(
+        self,
+        symbols: Optional[List[str]] = None,
+        **params
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        批量获取实时价格数据（一次请求返回多个交易对）
+        
+        需要多个交易对的行情时应使用本工具，而不是循环调用get_ticker。
+        
+        Args:
+            symbols: 交易对列表（不指定则返回全部交易对）
+            **params: 其他参数
+            
+        Returns:
+            {交易对: 价格数据字典}
+        """
+        exchange = self._get_public_exchange()
+        return await self._cached_market_data(
+            ('ticker', 'tickers', tuple(sorted(symbols)) if symbols else None),
+            lambda: exchange.fetch_tickers(symbols, params),
+            params
+        )
+    
+    @handle_ccxt_error
+    async def get_order_book(
         self,
         symbol: str,
         limit: int = 100,
+        raw: bool = False,
+        no_cache: bool = False,
         **params
     ) -> Dict[str, Any]:
         """
@@ -461,29 +1327,46 @@ class BinanceMCPTools:
         Args:
             symbol: 交易对
             limit: 深度数量限制
+            raw: 为True时直接返回Binance现货接口的原始数据
+                （{"lastUpdateId", "bids", "asks"}，价格数量为字符串），
+                跳过ccxt的市场加载与逐条解析
+            no_cache: 为True时跳过TTL缓存与websocket推送，向Binance请求最新数据
             **params: 其他参数
             
         Returns:
             订单簿数据
         """
-        accounts = self.config_manager.list_accounts()
-        if not accounts:
-            raise ValueError("未配置任何账户")
+        if not raw and not params and not no_cache:
+            order_book = self._market_stream.get('order_book', symbol, self._get_market_sandbox())
+            if order_book is not None:
+                return {**order_book, 'bids': order_book['bids'][:limit], 'asks': order_book['asks'][:limit]}
         
-        account_id = next(iter(accounts.keys()))
-        exchange = self._get_exchange(account_id)
+        exchange = self._get_public_exchange()
         
-        return exchange.fetch_order_book(symbol, limit, params)
+        if raw:
+            request = {'symbol': binance_symbol(symbol), 'limit': limit, **params}
+            fetch = lambda: exchange.publicGetDepth(request)
+        else:
+            fetch = lambda: exchange.fetch_order_book(symbol, limit, params)
+        
+        return await self._cached_market_data(
+            ('order_book', symbol, limit, raw),
+            fetch,
+            params,
+            0.0 if no_cache else None
+        )
     
     @handle_ccxt_error
-    def get_klines(
+    async def get_klines(
         self,
         symbol: str,
         timeframe: str = "1h",
         since: Optional[int] = None,
         limit: int = 100,
+        raw: bool = False,
+        packed: bool = False,
         **params
-    ) -> List[List]:
+    ) -> Union[List[List], Dict[str, Any]]:
         """
         获取K线数据
         
@@ -492,22 +1375,45 @@ class BinanceMCPTools:
             timeframe: 时间周期 ("1m", "5m", "1h", "1d" 等)
             since: 起始时间戳（可选）
             limit: 数量限制
+            raw: 为True时直接返回Binance现货接口的原始K线（12列，数值为字符串），
+                跳过ccxt的市场加载与逐条解析，适合大批量拉取
+            packed: 为True时返回打包的float64矩阵（见pack_ohlcv），
+                供程序化消费者用numpy.frombuffer直接还原，避免逐个浮点数的JSON编解码
             **params: 其他参数
             
         Returns:
-            K线数据列表 [[timestamp, open, high, low, close, volume], ...]
-        """
-        accounts = self.config_manager.list_accounts()
-        if not accounts:
-            raise ValueError("未配置任何账户")
-        
-        account_id = next(iter(accounts.keys()))
-        exchange = self._get_exchange(account_id)
-        
-        return exchange.fetch_ohlcv(symbol, timeframe, since, limit, params)
+            K线数据列表 [[timestamp, open, high, low, close, volume], ...]；
+            packed=True时为{"columns", "shape", "dtype", "data_b64"}
+        """
+        if packed and not raw:
+            # 与未打包的请求共用缓存，打包只在返回前进行
+            return pack_ohlcv(await self.get_klines(symbol, timeframe, since, limit, **params))
+        
+        exchange = self._get_public_exchange()
+        if timeframe not in exchange.timeframes:
+            # 在发出请求和计算缓存时长之前拦截无效周期，返回可操作的错误信息
+            raise ccxt.BadRequest(
+                f"{exchange.id} 不支持的K线周期: {timeframe}，可选: {', '.join(exchange.timeframes)}"
+            )
+        
+        if raw:
+            request = {'symbol': binance_symbol(symbol), 'interval': timeframe, 'limit': limit, **params}
+            if since is not None:
+                request['startTime'] = since
+            fetch = lambda: exchange.publicGetKlines(request)
+        else:
+            fetch = lambda: exchange.fetch_ohlcv(symbol, timeframe, since, limit, params)
+        
+        ttl = min(ccxt.Exchange.parse_timeframe(timeframe) / 4, self.MARKET_DATA_TTL['klines'])
+        return await self._cached_market_data(
+            ('klines', symbol, timeframe, since, limit, raw),
+            fetch,
+            params,
+            ttl
+        )
     
     @handle_ccxt_error
-    def get_trading_fees(
+    async def get_trading_fees(
         self,
         account_id: str,
         **params
@@ -523,12 +1429,18 @@ class BinanceMCPTools:
             手续费信息
         """
         exchange = self._get_exchange(account_id)
-        return exchange.fetch_trading_fees(params)
+        # 手续费等级很少变化，缓存1小时
+        return await self._cached_market_data(
+            ('trading_fees', account_id),
+            lambda: exchange.fetch_trading_fees(params),
+            params
+        )
     
     # ==================== 高级订单类型工具 ====================
     
     @handle_ccxt_error
-    def create_stop_loss_order(
+    @order_rate_limited
+    async def create_stop_loss_order(
         self,
         account_id: str,
         symbol: str,
@@ -552,10 +1464,11 @@ class BinanceMCPTools:
             订单信息
         """
         exchange = self._get_exchange(account_id)
-        return exchange.create_stop_loss_order(symbol, amount, stop_price, side, params)
+        return await exchange.create_stop_loss_order(symbol, amount, stop_price, side, params)
     
     @handle_ccxt_error
-    def create_take_profit_order(
+    @order_rate_limited
+    async def create_take_profit_order(
         self,
         account_id: str,
         symbol: str,
@@ -579,10 +1492,11 @@ class BinanceMCPTools:
             订单信息
         """
         exchange = self._get_exchange(account_id)
-        return exchange.create_take_profit_order(symbol, amount, take_profit_price, side, params)
+        return await exchange.create_take_profit_order(symbol, amount, take_profit_price, side, params)
     
     @handle_ccxt_error
-    def create_stop_limit_order(
+    @order_rate_limited
+    async def create_stop_limit_order(
         self,
         account_id: str,
         symbol: str,
@@ -608,10 +1522,11 @@ class BinanceMCPTools:
             订单信息
         """
         exchange = self._get_exchange(account_id)
-        return exchange.create_stop_limit_order(symbol, amount, stop_price, limit_price, side, params)
+        return await exchange.create_stop_limit_order(symbol, amount, stop_price, limit_price, side, params)
     
     @handle_ccxt_error
-    def create_trailing_stop_order(
+    @order_rate_limited
+    async def create_trailing_stop_order(
         self,
         account_id: str,
         symbol: str,
@@ -635,10 +1550,11 @@ class BinanceMCPTools:
             订单信息
         """
         exchange = self._get_exchange(account_id)
-        return exchange.create_trailing_percent_order(symbol, 'stop', side, amount, None, trail_percent, params)
+        return await exchange.create_trailing_percent_order(symbol, 'stop', side, amount, None, trail_percent, params)
     
     @handle_ccxt_error
-    def create_oco_order(
+    @order_rate_limited
+    async def create_oco_order(
         self,
         account_id: str,
         symbol: str,
@@ -667,31 +1583,25 @@ class BinanceMCPTools:
         """
         exchange = self._get_exchange(account_id)
         
-        # Binance OCO订单参数
-        oco_params = {
+        # 调用Binance现货OCO接口（POST /api/v3/order/oco），请求参数一次构建
+        # 指定止损限价时Binance要求同时给出stopLimitTimeInForce，默认GTC，可由params覆盖
+        return await exchange.private_post_order_oco({
+            'symbol': binance_symbol(symbol),
+            'side': side.upper(),
             'quantity': amount,
             'price': price,
             'stopPrice': stop_price,
-            'side': side.upper()
-        }
-        
-        if stop_limit_price:
-            oco_params['stopLimitPrice'] = stop_limit_price
-            
-        oco_params.update(params)
-        
-        # 调用Binance专用OCO接口
-        return exchange.sapi_post_order_oco({
-            'symbol': symbol.replace('/', ''),
-            **oco_params
+            **({'stopLimitPrice': stop_limit_price, 'stopLimitTimeInForce': 'GTC'} if stop_limit_price else {}),
+            **params
         })
     
     # ==================== 市场数据深度工具 ====================
     
     @handle_ccxt_error
-    def get_funding_rate(
+    async def get_funding_rate(
         self,
         symbol: str,
+        no_cache: bool = False,
         **params
     ) -> Dict[str, Any]:
         """
@@ -699,24 +1609,26 @@ class BinanceMCPTools:
         
         Args:
             symbol: 交易对
+            no_cache: 为True时跳过TTL缓存，向Binance请求最新数据
             **params: 其他参数
             
         Returns:
             资金费率信息
         """
-        accounts = self.config_manager.list_accounts()
-        if not accounts:
-            raise ValueError("未配置任何账户")
+        exchange = self._get_public_exchange('future')
         
-        account_id = next(iter(accounts.keys()))
-        exchange = self._get_exchange(account_id)
-        
-        return exchange.fetch_funding_rate(symbol, params)
+        return await self._cached_market_data(
+            ('funding_rate', symbol),
+            lambda: exchange.fetch_funding_rate(symbol, params),
+            params,
+            0.0 if no_cache else None
+        )
     
     # ==================== 期权交易工具 ====================
     
     @handle_ccxt_error
-    def create_option_order(
+    @order_rate_limited
+    async def create_option_order(
         self,
         account_id: str,
         symbol: str,
@@ -741,15 +1653,12 @@ class BinanceMCPTools:
         Returns:
             期权订单信息
         """
-        exchange = self._get_exchange(account_id)
-        
-        # 切换到期权市场
-        exchange.options['defaultType'] = 'option'
-        
-        return exchange.create_order(symbol, option_type, side, amount, price, params)
+        validate_order(side, option_type, amount, price, OPTION_ORDER_TYPES)
+        exchange = self._get_exchange(account_id, 'option')
+        return await exchange.create_order(symbol, option_type, side, amount, price, params)
     
     @handle_ccxt_error
-    def get_option_chain(
+    async def get_option_chain(
         self,
         underlying: str,
         **params
@@ -764,17 +1673,12 @@ class BinanceMCPTools:
         Returns:
             期权链数据
         """
-        accounts = self.config_manager.list_accounts()
-        if not accounts:
-            raise ValueError("未配置任何账户")
-        
-        account_id = next(iter(accounts.keys()))
-        exchange = self._get_exchange(account_id)
+        exchange = self._get_public_exchange()
         
-        return exchange.fetch_option_chain(underlying, params)
+        return await exchange.fetch_option_chain(underlying, params)
     
     @handle_ccxt_error
-    def get_option_positions(
+    async def get_option_positions(
         self,
         account_id: str,
         **params
@@ -789,14 +1693,13 @@ class BinanceMCPTools:
         Returns:
             期权持仓列表
         """
-        exchange = self._get_exchange(account_id)
-        exchange.options['defaultType'] = 'option'
+        exchange = self._get_exchange(account_id, 'option')
         
         # ccxt的fetch_option_positions不需要symbol参数
-        return exchange.fetch_option_positions(None, params)
+        return await exchange.fetch_option_positions(None, params)
     
     @handle_ccxt_error
-    def get_option_info(
+    async def get_option_info(
         self,
         symbol: str,
         **params
@@ -811,19 +1714,15 @@ class BinanceMCPTools:
         Returns:
             期权合约详情
         """
-        accounts = self.config_manager.list_accounts()
-        if not accounts:
-            raise ValueError("未配置任何账户")
+        exchange = self._get_public_exchange()
         
-        account_id = next(iter(accounts.keys()))
-        exchange = self._get_exchange(account_id)
-        
-        return exchange.fetch_option(symbol, params)
+        return await exchange.fetch_option(symbol, params)
     
     # ==================== 合约/期货交易工具 ====================
     
     @handle_ccxt_error
-    def create_contract_order(
+    @order_rate_limited
+    async def create_contract_order(
         self,
         account_id: str,
         symbol: str,
@@ -850,43 +1749,21 @@ class BinanceMCPTools:
         Returns:
             合约订单信息
         """
-        exchange = self._get_exchange(account_id)
+        validate_order(side, order_type, amount, price, FUTURES_ORDER_TYPES)
         
         # 检查是否为统一账户模式
-        account_config = self.config_manager.get_account(account_id)
-        is_portfolio_margin = account_config.get('portfolio_margin', False)
+        is_portfolio_margin = self.config_manager.is_portfolio_margin(account_id)
         
         if is_portfolio_margin:
             # 统一账户模式：使用Portfolio Margin API下单
-            # 双向持仓模式需要指定positionSide
-            position_side = 'LONG' if side.upper() == 'BUY' else 'SHORT'
-            
-            order_params = {
-                'symbol': symbol.replace('/', ''),
-                'side': side.upper(),
-                'type': order_type.upper(),
-                'quantity': amount,
-                'positionSide': position_side  # 双向持仓模式必需
-            }
-            
-            if order_type != "market" and price is not None:
-                order_params['price'] = price
-            
-            order_params.update(params)
-            
-            # 使用正确的CCXT Portfolio Margin API方法
-            return exchange.papiPostUmOrder(order_params)
+            return await self._create_um_order(account_id, symbol, side, order_type, amount, price, params)
         else:
             # 普通账户模式：使用原有逻辑
-            if contract_type == "delivery":
-                exchange.options['defaultType'] = 'delivery'
-            else:
-                exchange.options['defaultType'] = 'future'
-            
-            return exchange.create_order(symbol, order_type, side, amount, price, params)
+            exchange = self._get_exchange(account_id, self.CONTRACT_MARKET_TYPES.get(contract_type, 'future'))
+            return await exchange.create_order(symbol, order_type, side, amount, price, params)
     
     @handle_ccxt_error
-    def close_position(
+    async def close_position(
         self,
         account_id: str,
         symbol: str,
@@ -896,6 +1773,12 @@ class BinanceMCPTools:
         """
         一键平仓
         
+        平仓单均为市价单，每笔平仓单各占用一次下单额度。普通账户的平仓单为只减仓
+        （reduceOnly）单，持仓数据过时也不会反向开仓；统一账户按持仓方向指定positionSide平仓。
+        
+        单笔平仓单失败不影响其他持仓：closed_positions中对应位置为status为rejected的条目
+        （symbol, side, amount, position_side, error_type, error），不抛出异常。
+        
         Args:
             account_id: 账户ID
             symbol: 交易对 (期货格式，如 "BTCUSDT")
@@ -903,31 +1786,65 @@ class BinanceMCPTools:
             **params: 其他参数
             
         Returns:
-            平仓结果
+            平仓结果：closed_positions为各持仓的平仓订单（被拒绝的为rejected条目）
         """
-        exchange = self._get_exchange(account_id)
+        exchange = self._get_exchange(account_id, 'future')
         
         # 获取当前持仓
-        positions = exchange.fetch_positions([symbol])
+        positions = await exchange.fetch_positions([symbol])
+        is_portfolio_margin = self.config_manager.is_portfolio_margin(account_id)
         
-        results = []
+        position_sides = []
+        close_orders = []
         for position in positions:
             if position['contracts'] > 0:  # 有持仓
                 position_side = position['side']
                 if side is None or position_side == side:
                     # 平仓（反向开单）
                     close_side = 'sell' if position_side == 'long' else 'buy'
-                    close_amount = position['contracts']
                     
-                    result = exchange.create_market_order(
-                        symbol, close_side, close_amount, None, params
-                    )
-                    results.append(result)
+                    await self._order_limiter.acquire(account_id)
+                    position_sides.append(position_side)
+                    close_orders.append({
+                        'symbol': symbol,
+                        'type': 'market',
+                        'side': close_side,
+                        'amount': position['contracts'],
+                        'price': None,
+                    })
         
-        return {"closed_positions": results}
+        if is_portfolio_margin:
+            # 统一账户与create_futures_order一样走papi；双向持仓模式下平仓需指定持仓自身的
+            # positionSide，且该模式不接受reduceOnly参数
+            results = await asyncio.gather(*(
+                self._create_um_order(
+                    account_id, symbol, order['side'], order['type'], order['amount'], None,
+                    {**params, 'positionSide': position_side.upper()}
+                )
+                for order, position_side in zip(close_orders, position_sides)
+            ), return_exceptions=True)
+        else:
+            # 双向持仓时多空两侧的平仓单（及同时平其他交易对的请求）合并为一次batchOrders提交
+            close_params = {**params, 'reduceOnly': True}
+            results = await self._futures_batcher.submit_all(account_id, exchange, [
+                {**order, 'params': close_params} for order in close_orders
+            ])
+        
+        return {"closed_positions": [
+            {
+                'status': 'rejected',
+                'symbol': order['symbol'],
+                'side': order['side'],
+                'amount': order['amount'],
+                'position_side': position_side,
+                'error_type': type(result).__name__,
+                'error': str(result),
+            } if isinstance(result, Exception) else result
+            for order, position_side, result in zip(close_orders, position_sides, results)
+        ]}
     
     @handle_ccxt_error
-    def get_futures_positions(
+    async def get_futures_positions(
         self,
         account_id: str,
         symbols: Optional[List[str]] = None,
@@ -944,15 +1861,13 @@ class BinanceMCPTools:
         Returns:
             期货持仓列表
         """
-        exchange = self._get_exchange(account_id)
-        exchange.options['defaultType'] = 'future'
-        
-        return exchange.fetch_positions(symbols, params)
+        exchange = self._get_exchange(account_id, 'future')
+        return await exchange.fetch_positions(symbols, params)
     
     # ==================== 完善的订单管理工具 ====================
     
     @handle_ccxt_error
-    def get_order_status(
+    async def get_order_status(
         self,
         account_id: str,
         order_id: str,
@@ -972,10 +1887,10 @@ class BinanceMCPTools:
             订单详细信息
         """
         exchange = self._get_exchange(account_id)
-        return exchange.fetch_order(order_id, symbol, params)
+        return await exchange.fetch_order(order_id, symbol, params)
     
     @handle_ccxt_error
-    def get_my_trades(
+    async def get_my_trades(
         self,
         account_id: str,
         symbol: Optional[str] = None,
@@ -997,10 +1912,10 @@ class BinanceMCPTools:
             成交记录列表
         """
         exchange = self._get_exchange(account_id)
-        return exchange.fetch_my_trades(symbol, since, limit, params)
+        return await exchange.fetch_my_trades(symbol, since, limit, params)
     
     @handle_ccxt_error
-    def cancel_all_orders(
+    async def cancel_all_orders(
         self,
         account_id: str,
         symbol: Optional[str] = None,
@@ -1018,12 +1933,25 @@ class BinanceMCPTools:
             取消结果列表
         """
         exchange = self._get_exchange(account_id)
-        return exchange.cancel_all_orders(symbol, params)
+        if symbol is not None:
+            return await exchange.cancel_all_orders(symbol, params)
+        
+        # Binance的撤单接口必须指定交易对：先查出有挂单的交易对，再并发逐个撤销
+        open_orders = await exchange.fetch_open_orders(None, None, None, params)
+        symbols = list(dict.fromkeys(order['symbol'] for order in open_orders))
+        semaphore = asyncio.Semaphore(self.MULTI_SYMBOL_CONCURRENCY)
+        
+        async def cancel(symbol: str) -> List[Dict[str, Any]]:
+            async with semaphore:
+                return await exchange.cancel_all_orders(symbol, params)
+        
+        results = await asyncio.gather(*(cancel(symbol) for symbol in symbols))
+        return [order for orders in results for order in orders]
     
     # ==================== 账户设置管理工具 ====================
     
     @handle_ccxt_error
-    def set_leverage(
+    async def set_leverage(
         self,
         account_id: str,
         symbol: str,
@@ -1042,11 +1970,11 @@ class BinanceMCPTools:
         Returns:
             设置结果
         """
-        exchange = self._get_exchange(account_id)
-        return exchange.set_leverage(leverage, symbol, params)
+        exchange = self._get_exchange(account_id, 'future')
+        return await exchange.set_leverage(leverage, symbol, params)
     
     @handle_ccxt_error
-    def set_margin_mode(
+    async def set_margin_mode(
         self,
         account_id: str,
         symbol: str,
@@ -1065,11 +1993,11 @@ class BinanceMCPTools:
         Returns:
             设置结果
         """
-        exchange = self._get_exchange(account_id)
-        return exchange.set_margin_mode(margin_mode, symbol, params)
+        exchange = self._get_exchange(account_id, 'future')
+        return await exchange.set_margin_mode(margin_mode, symbol, params)
     
     @handle_ccxt_error
-    def transfer_funds(
+    async def transfer_funds(
         self,
         account_id: str,
         currency: str,
@@ -1094,46 +2022,28 @@ class BinanceMCPTools:
         """
         # 对于转账功能，需要使用不带portfolioMargin配置的exchange
         # 因为universal transfer API不支持portfolioMargin模式
-        account_config = self.config_manager.get_account(account_id)
-        
-        # 创建专门用于转账的exchange实例
-        transfer_exchange = ccxt.binance({
-            'apiKey': account_config['api_key'],
-            'secret': account_config['secret'],
-            'sandbox': account_config.get('sandbox', False),
-            'enableRateLimit': True,
-            'options': {
-                'broker': {
-                    'spot': 'C96E9MGA',
-                    'future': 'eFC56vBf',
-                    'option': 'eFC56vBf',
-                },
-                # 重要: 不设置portfolioMargin，让转账使用universal transfer API
-            }
-        })
+        transfer_exchange = self._get_spot_only_exchange(account_id)
         
         # 统一账户模式下，直接调用universal transfer API
-        account_config = self.config_manager.get_account(account_id)
-        is_portfolio_margin = account_config.get('portfolio_margin', False)
+        is_portfolio_margin = self.config_manager.is_portfolio_margin(account_id)
         
         if is_portfolio_margin:
             # 统一账户模式：根据币安的限制，需要特殊处理转账路径
             # 现货 ↔ 期货 必须通过全仓杠杆账户中转
-            transfer_exchange.load_markets()
+            await transfer_exchange.load_markets()
             
             if from_account == 'spot' and to_account == 'future':
                 # 现货 → 期货：统一账户模式的特殊处理
                 # 步骤1：现货 → 全仓杠杆（杠杆余额可直接用于期货交易）
-                step1_result = transfer_exchange.sapi_post_asset_transfer({
+                step1_result = await transfer_exchange.sapi_post_asset_transfer({
                     'type': 'MAIN_MARGIN',
                     'asset': currency,
                     'amount': amount,
                     **params
                 })
                 
-                # 等待1秒确保转账完成
-                import time
-                time.sleep(1)
+                # 等待1秒确保转账完成（不阻塞事件循环）
+                await asyncio.sleep(1)
                 
                 return {
                     'tranId': step1_result.get('tranId'),
@@ -1144,19 +2054,18 @@ class BinanceMCPTools:
             elif from_account == 'future' and to_account == 'spot':
                 # 期货 → 现货：分两步
                 # 步骤1：期货 → 全仓杠杆  
-                step1_result = transfer_exchange.sapi_post_asset_transfer({
+                step1_result = await transfer_exchange.sapi_post_asset_transfer({
                     'type': 'UMFUTURE_MARGIN',
                     'asset': currency, 
                     'amount': amount,
                     **params
                 })
                 
-                # 等待1秒确保转账完成
-                import time
-                time.sleep(1)
+                # 等待1秒确保转账完成（不阻塞事件循环）
+                await asyncio.sleep(1)
                 
                 # 步骤2：全仓杠杆 → 现货
-                step2_result = transfer_exchange.sapi_post_asset_transfer({
+                step2_result = await transfer_exchange.sapi_post_asset_transfer({
                     'type': 'MARGIN_MAIN',
                     'asset': currency,
                     'amount': amount, 
@@ -1183,7 +2092,7 @@ class BinanceMCPTools:
                 if not transfer_type:
                     raise ValueError(f"统一账户模式下不支持的转账类型: {from_account} -> {to_account}")
                 
-                return transfer_exchange.sapi_post_asset_transfer({
+                return await transfer_exchange.sapi_post_asset_transfer({
                     'type': transfer_type,
                     'asset': currency,
                     'amount': amount,
@@ -1191,20 +2100,85 @@ class BinanceMCPTools:
                 })
         else:
             # 普通账户模式：使用ccxt的transfer方法
-            return transfer_exchange.transfer(currency, amount, from_account, to_account, params)
+            return await transfer_exchange.transfer(currency, amount, from_account, to_account, params)
     
     # ==================== 工具辅助方法 ====================
     
     def get_available_tools(self) -> List[str]:
-        """获取可用工具列表"""
-        tools = []
-        for attr_name in dir(self):
-            if not attr_name.startswith('_') and callable(getattr(self, attr_name)):
-                if attr_name not in ['get_available_tools']:
-                    tools.append(attr_name)
-        return tools
+        """获取可用工具列表（类定义完成时计算一次）"""
+        return list(self._TOOL_NAMES)
+    
+    def start_preloading_markets(self) -> None:
+        """在后台预加载市场信息，之后定期刷新，使工具调用不必等待load_markets（服务启动时调用）"""
+        if self._preload_task is None or self._preload_task.done():
+            self._preload_task = asyncio.ensure_future(self._maintain_markets())
+    
+    async def _maintain_markets(self) -> None:
+        """预加载市场信息，之后每隔MARKETS_REFRESH_INTERVAL重新加载一次（服务停止时取消）"""
+        await self.preload_markets()
+        while True:
+            await asyncio.sleep(self.MARKETS_REFRESH_INTERVAL)
+            await self.refresh_markets()
+    
+    def _market_environments(self) -> set:
+        """需要市场信息的环境：已配置账户所在的环境，以及行情工具使用的环境（未配置账户时为正式网）"""
+        environments = {
+            bool(account_info.get('sandbox', False))
+            for account_info in self.config_manager.list_accounts().values()
+        }
+        environments.add(self._get_market_sandbox())
+        return environments
+    
+    async def preload_markets(self) -> None:
+        """
+        预加载市场信息
+        
+        市场信息是公共数据，通过不带凭证的公共实例加载，无需解密账户配置；
+        工厂在同一环境（正式/沙盒）的实例间共享加载结果，账户实例与行情工具随后直接复用。
+        失败只记录日志，之后按需重新加载。
+        """
+        async def load(sandbox: bool) -> None:
+            try:
+                await exchange_factory.create_public_exchange(sandbox).load_markets()
+            except Exception as e:
+                logger.warning("Failed to preload markets (sandbox=%s): %s", sandbox, e)
+        
+        await asyncio.gather(*(load(sandbox) for sandbox in self._market_environments()))
+    
+    async def refresh_markets(self) -> None:
+        """
+        重新加载市场列表（新上线、下线的交易对），每个环境请求一次并更新该环境的所有缓存实例
+        
+        失败只记录日志，各实例继续使用已加载的市场列表。
+        """
+        async def reload(sandbox: bool) -> None:
+            try:
+                count = await exchange_factory.reload_markets(sandbox)
+                logger.debug("Reloaded %d markets (sandbox=%s)", count, sandbox)
+            except Exception as e:
+                logger.warning("Failed to reload markets (sandbox=%s): %s", sandbox, e)
+        
+        await asyncio.gather(*(reload(sandbox) for sandbox in self._market_environments()))
     
     def clear_exchange_cache(self) -> None:
-        """清除exchange实例缓存"""
+        """清除exchange实例缓存及行情数据缓存"""
+        self._exchange_cache.clear()
+        self._market_data_cache.clear()
+        exchange_factory.clear_exchange_cache()
+    
+    async def close_exchanges(self) -> None:
+        """关闭所有exchange的HTTP会话并清除缓存（服务停止时调用）"""
+        if self._preload_task is not None:
+            self._preload_task.cancel()
+            self._preload_task = None
         self._exchange_cache.clear()
-        logger.info("Exchange cache cleared")
\ No newline at end of file
+        self._market_data_cache.clear()
+        await self._market_stream.close()
+        await exchange_factory.close_all_exchanges()
+        logger.info("Exchange cache cleared")
+
+
+# 工具方法名（按名称排序），只在导入时扫描一次类属性
+BinanceMCPTools._TOOL_NAMES = tuple(sorted(
+    name for name, attr in vars(BinanceMCPTools).items() if getattr(attr, '_is_tool', False)
+))
@@ -51,11 +51,13 @@ setup(
         "fastmcp>=1.0.0",           # MCP协议框架  
         "click>=8.0.0",             # CLI框架
         "cryptography>=3.4.0",      # 加密存储
+        "pynacl>=1.5.0",            # SecretBox加密
         
         # 辅助依赖
         "requests>=2.28.0",         # HTTP请求
-        "aiohttp>=3.8.0",           # 异步HTTP
+        "aiohttp>=3.12.0",           # 异步HTTP
         "pydantic>=1.10.0",         # 数据验证
+        "orjson>=3.8.0",            # JSON解析（ccxt检测到时自动用于解析响应）
     ],
     extras_require={
         "dev": [
@@ -77,6 +79,9 @@ setup(
             "pytest-cov>=4.0.0", 
             "pytest-asyncio>=0.21.0",
             "responses>=0.23.0",    # HTTP mock
+        ],
+        "fast": [
+            "uvloop>=0.17.0; sys_platform != 'win32'",  # 更快的事件循环
         ]
     },
     entry_points={
@@ -10,13 +10,21 @@ from unittest.mock import Mock, patch
 from typing import Dict, Any
 
 import pytest
-import ccxt
+import ccxt.async_support as ccxt_async
 
 from binance_mcp.config import ConfigManager
 from binance_mcp.broker import BinanceExchangeFactory
 from binance_mcp.tools import BinanceMCPTools
 
 
+@pytest.fixture(autouse=True)
+def clear_factory_cache():
+    """每个测试前后清空进程级exchange缓存，避免mock实例跨测试复用"""
+    BinanceExchangeFactory.clear_exchange_cache()
+    yield
+    BinanceExchangeFactory.clear_exchange_cache()
+
+
 @pytest.fixture
 def temp_config_dir():
     """创建临时配置目录"""
@@ -40,7 +48,12 @@ def config_manager(temp_config_dir):
         
         # 初始化加密和配置
         from cryptography.fernet import Fernet
-        config_manager._cipher = Fernet(Fernet.generate_key())
+        config_manager._key = Fernet.generate_key()
+        config_manager._box = None
+        config_manager._legacy_cipher = None
+        config_manager._account_cache = {}
+        config_manager._config_version = 0
+        config_manager._accounts_snapshot = None
         config_manager._config = {
             "accounts": {},
             "server": {"port": 9001, "host": "127.0.0.1", "log_level": "INFO"},
@@ -52,12 +65,13 @@ def config_manager(temp_config_dir):
 
 @pytest.fixture
 def mock_binance_exchange():
-    """创建mock的Binance exchange实例"""
-    exchange = Mock(spec=ccxt.binance)
+    """创建mock的Binance exchange实例（异步方法自动为AsyncMock）"""
+    exchange = Mock(spec=ccxt_async.binance)
     
     # 基础属性
     exchange.id = 'binance'
     exchange.name = 'Binance'
+    exchange.timeframes = {'1m': '1m', '5m': '5m', '1h': '1h', '1d': '1d'}
     exchange.options = {
         'broker': {
             'spot': 'C96E9MGA',
@@ -168,8 +182,9 @@ def tools_with_mock_exchange(config_manager, mock_binance_exchange):
         '测试账户'
     )
     
-    # Mock _get_exchange方法返回mock exchange
-    with patch.object(tools, '_get_exchange', return_value=mock_binance_exchange):
+    # Mock _get_exchange和_get_public_exchange方法返回mock exchange
+    with patch.object(tools, '_get_exchange', return_value=mock_binance_exchange), \
+            patch.object(tools, '_get_public_exchange', return_value=mock_binance_exchange):
         yield tools
 
 
@@ -2,8 +2,11 @@
 简化的Broker ID注入工厂单元测试
 """
 
+import asyncio
+import hashlib
+
 import pytest
-from unittest.mock import Mock, patch
+from unittest.mock import Mock, AsyncMock, patch
 import ccxt
 
 from binance_mcp.broker import BinanceExchangeFactory
@@ -27,7 +30,7 @@ class TestBinanceExchangeFactory:
         
         assert BinanceExchangeFactory.BROKER_IDS == expected_broker_ids
     
-    @patch('ccxt.binance')
+    @patch('ccxt.async_support.binance')
     def test_create_exchange_success(self, mock_binance_class):
         """测试成功创建exchange"""
         # 设置mock对象
@@ -54,9 +57,32 @@ class TestBinanceExchangeFactory:
         assert call_args['enableRateLimit'] is True
         assert 'broker' in call_args['options']
         assert call_args['options']['defaultType'] == 'spot'
+        assert call_args['options']['recvWindow'] == 5000
+        assert call_args['timeout'] == 10000
         
         assert result == mock_exchange
     
+    @patch('ccxt.async_support.binance')
+    def test_create_exchange_reuses_cached_instance(self, mock_binance_class):
+        """测试相同凭证复用同一exchange实例"""
+        mock_binance_class.return_value = Mock(options={'broker': BinanceExchangeFactory.BROKER_IDS.copy()})
+        config = {'api_key': 'test_key', 'secret': 'test_secret'}
+        
+        first = BinanceExchangeFactory.create_exchange(config)
+        second = BinanceExchangeFactory.create_exchange(dict(config))
+        
+        assert first is second
+        mock_binance_class.assert_called_once()
+        assert BinanceExchangeFactory.get_exchange_cache_stats() == {'size': 1, 'hits': 1, 'misses': 1, 'test_results': 0}
+        
+        # 不同凭证或清空缓存后重新创建
+        BinanceExchangeFactory.create_exchange({'api_key': 'other_key', 'secret': 'test_secret'})
+        assert mock_binance_class.call_count == 2
+        
+        BinanceExchangeFactory.clear_exchange_cache()
+        BinanceExchangeFactory.create_exchange(config)
+        assert mock_binance_class.call_count == 3
+    
     def test_missing_api_key_raises_error(self):
         """测试缺少API key时抛出错误"""
         config = {
@@ -75,7 +101,7 @@ class TestBinanceExchangeFactory:
         with pytest.raises(ValueError, match="账户配置缺少必要字段: secret"):
             BinanceExchangeFactory.create_exchange(config)
     
-    @patch('ccxt.binance')
+    @patch('ccxt.async_support.binance')
     def test_create_exchange_error_handling(self, mock_binance_class):
         """测试exchange创建时的错误处理"""
         mock_binance_class.side_effect = ccxt.BaseError("API创建失败")
@@ -107,7 +133,7 @@ class TestBinanceExchangeFactory:
         expected_types = ['spot', 'margin', 'future', 'delivery', 'swap', 'option', 'inverse']
         assert set(market_types) == set(expected_types)
     
-    @patch('ccxt.binance')
+    @patch('ccxt.async_support.binance')
     def test_create_exchange_for_market_type_spot(self, mock_binance_class):
         """测试为现货市场创建exchange"""
         mock_exchange = Mock()
@@ -121,7 +147,7 @@ class TestBinanceExchangeFactory:
         assert result == mock_exchange
         assert result.options['defaultType'] == 'spot'
     
-    @patch('ccxt.binance')
+    @patch('ccxt.async_support.binance')
     def test_create_exchange_for_market_type_future(self, mock_binance_class):
         """测试为期货市场创建exchange"""
         mock_exchange = Mock()
@@ -133,4 +159,276 @@ class TestBinanceExchangeFactory:
         result = BinanceExchangeFactory.create_exchange_for_market_type(config, 'future')
         
         assert result == mock_exchange
-        assert result.options['defaultType'] == 'future'
\ No newline at end of file
+        assert result.options['defaultType'] == 'future'
+    
+    @pytest.mark.asyncio
+    @patch('ccxt.async_support.binance')
+    async def test_exchange_connection_success(self, mock_binance_class):
+        """测试连接测试成功并释放会话"""
+        mock_exchange = Mock()
+        mock_exchange.options = {'broker': BinanceExchangeFactory.BROKER_IDS.copy()}
+        mock_exchange.fetch_time = AsyncMock(return_value=1234567890000)
+        mock_exchange.fetch_balance = AsyncMock(return_value={'BTC': {}, 'USDT': {}})
+        mock_exchange.close = AsyncMock()
+        mock_binance_class.return_value = mock_exchange
+        
+        result = await BinanceExchangeFactory.test_exchange_connection(
+            {'api_key': 'key', 'secret': 'secret'}
+        )
+        
+        assert result['success'] is True
+        assert result['server_time'] == 1234567890000
+        assert result['account_info']['total_currencies'] == 2
+        assert result['broker_injected'] is True
+        mock_exchange.close.assert_awaited_once()
+    
+    @pytest.mark.asyncio
+    @patch('ccxt.async_support.binance')
+    async def test_exchange_connection_private_api_failure(self, mock_binance_class):
+        """测试私有API失败时返回错误"""
+        mock_exchange = Mock()
+        mock_exchange.options = {'broker': BinanceExchangeFactory.BROKER_IDS.copy()}
+        mock_exchange.fetch_time = AsyncMock(return_value=1234567890000)
+        mock_exchange.fetch_balance = AsyncMock(side_effect=ccxt.AuthenticationError("API密钥无效"))
+        mock_exchange.close = AsyncMock()
+        mock_binance_class.return_value = mock_exchange
+        
+        result = await BinanceExchangeFactory.test_exchange_connection(
+            {'api_key': 'key', 'secret': 'secret'}
+        )
+        
+        assert result['success'] is False
+        assert result['server_time'] == 1234567890000
+        assert "API密钥无效" in result['error']
+        mock_exchange.close.assert_awaited_once()
+    
+    @pytest.mark.asyncio
+    @patch('ccxt.async_support.binance')
+    async def test_exchange_connection_concurrent_calls_share_request(self, mock_binance_class):
+        """测试同一账户的并发连接测试只发起一次请求"""
+        mock_exchange = Mock()
+        mock_exchange.options = {'broker': BinanceExchangeFactory.BROKER_IDS.copy()}
+        mock_exchange.fetch_time = AsyncMock(return_value=1234567890000)
+        mock_exchange.fetch_balance = AsyncMock(return_value={'BTC': {}})
+        mock_exchange.close = AsyncMock()
+        mock_binance_class.return_value = mock_exchange
+        
+        config = {'api_key': 'key', 'secret': 'secret'}
+        results = await asyncio.gather(*(
+            BinanceExchangeFactory.test_exchange_connection(config) for _ in range(5)
+        ))
+        
+        assert all(result['success'] for result in results)
+        mock_exchange.fetch_balance.assert_awaited_once()
+        assert BinanceExchangeFactory._inflight_tests == {}
+    
+    @pytest.mark.asyncio
+    @patch('ccxt.async_support.binance')
+    async def test_exchange_connection_result_cached_within_ttl(self, mock_binance_class):
+        """测试TTL内复用成功结果，force=True时重新测试"""
+        mock_exchange = Mock()
+        mock_exchange.options = {'broker': BinanceExchangeFactory.BROKER_IDS.copy()}
+        mock_exchange.fetch_time = AsyncMock(return_value=1234567890000)
+        mock_exchange.fetch_balance = AsyncMock(return_value={'BTC': {}})
+        mock_exchange.close = AsyncMock()
+        mock_binance_class.return_value = mock_exchange
+        
+        config = {'api_key': 'key', 'secret': 'secret'}
+        first = await BinanceExchangeFactory.test_exchange_connection(config)
+        second = await BinanceExchangeFactory.test_exchange_connection(config)
+        
+        assert first == second
+        assert mock_exchange.fetch_balance.await_count == 1
+        assert BinanceExchangeFactory.get_exchange_cache_stats()['test_results'] == 1
+        
+        await BinanceExchangeFactory.test_exchange_connection(config, force=True)
+        assert mock_exchange.fetch_balance.await_count == 2
+    
+    @pytest.mark.asyncio
+    @patch('ccxt.async_support.binance')
+    async def test_close_all_exchanges(self, mock_binance_class):
+        """测试关闭所有缓存实例的会话并清空缓存"""
+        exchanges = []
+        
+        def make_exchange(config):
+            exchange = Mock(options={'broker': BinanceExchangeFactory.BROKER_IDS.copy()})
+            exchange.close = AsyncMock()
+            exchanges.append(exchange)
+            return exchange
+        
+        mock_binance_class.side_effect = make_exchange
+        BinanceExchangeFactory.create_exchange({'api_key': 'key_a', 'secret': 'secret'})
+        BinanceExchangeFactory.create_exchange({'api_key': 'key_b', 'secret': 'secret'})
+        
+        await BinanceExchangeFactory.close_all_exchanges()
+        
+        for exchange in exchanges:
+            exchange.close.assert_awaited_once()
+        assert BinanceExchangeFactory.get_exchange_cache_stats()['size'] == 0
+    
+    @patch('ccxt.async_support.binance')
+    def test_cached_exchanges_share_throttler(self, mock_binance_class):
+        """测试同一环境的缓存实例共享限流器"""
+        mock_binance_class.side_effect = lambda config: Mock(
+            options={'broker': BinanceExchangeFactory.BROKER_IDS.copy()}
+        )
+        
+        spot = BinanceExchangeFactory.create_exchange({'api_key': 'key_a', 'secret': 'secret'})
+        future = BinanceExchangeFactory.create_exchange({'api_key': 'key_b', 'secret': 'secret'}, 'future')
+        sandbox = BinanceExchangeFactory.create_exchange({'api_key': 'key_a', 'secret': 'secret', 'sandbox': True})
+        
+        assert spot.throttler is future.throttler
+        assert sandbox.throttler is not spot.throttler
+    
+    @pytest.mark.asyncio
+    @patch.object(BinanceExchangeFactory, 'RETRY_BASE_DELAY', 0)
+    @patch('ccxt.async_support.binance')
+    async def test_transient_errors_are_retried(self, mock_binance_class):
+        """测试限流错误重试，写请求遇到交易所不可用时不重试"""
+        mock_exchange = Mock(options={'broker': BinanceExchangeFactory.BROKER_IDS.copy()})
+        base_fetch2 = mock_exchange.fetch2 = AsyncMock(side_effect=[ccxt.RateLimitExceeded('429'), {'ok': True}])
+        mock_binance_class.return_value = mock_exchange
+        
+        exchange = BinanceExchangeFactory.create_exchange({'api_key': 'key', 'secret': 'secret'})
+        
+        assert await exchange.fetch2('ticker/price', 'public', 'GET') == {'ok': True}
+        assert base_fetch2.await_count == 2
+        
+        base_fetch2.side_effect = ccxt.ExchangeNotAvailable('503')
+        with pytest.raises(ccxt.ExchangeNotAvailable):
+            await exchange.fetch2('order', 'private', 'POST')
+        assert base_fetch2.await_count == 3
+    
+    @pytest.mark.asyncio
+    @patch.object(BinanceExchangeFactory, 'RETRY_BASE_DELAY', 0)
+    @patch('ccxt.async_support.binance')
+    async def test_rate_limit_pauses_all_cached_exchanges(self, mock_binance_class):
+        """测试一个实例被限流后，同一环境的其他实例按Retry-After一起暂停"""
+        loop = asyncio.get_running_loop()
+        other_called_at = []
+        
+        async def other_fetch2(*args):
+            other_called_at.append(loop.time())
+            return {'ok': True}
+        
+        base_fetches = [
+            AsyncMock(side_effect=[ccxt.RateLimitExceeded('429'), {'ok': True}]),
+            AsyncMock(side_effect=other_fetch2),
+        ]
+        mock_binance_class.side_effect = [
+            Mock(
+                options={'broker': BinanceExchangeFactory.BROKER_IDS.copy()},
+                fetch2=fetch2,
+                last_response_headers={'Retry-After': '0.2'}
+            )
+            for fetch2 in base_fetches
+        ]
+        
+        limited = BinanceExchangeFactory.create_exchange({'api_key': 'key_a', 'secret': 'secret'})
+        other = BinanceExchangeFactory.create_exchange({'api_key': 'key_b', 'secret': 'secret'})
+        
+        started = loop.time()
+        results = await asyncio.gather(
+            limited.fetch2('ticker/price', 'public', 'GET'),
+            other.fetch2('ticker/price', 'public', 'GET')
+        )
+        
+        assert results == [{'ok': True}, {'ok': True}]
+        assert other_called_at[0] - started >= 0.15
+    
+    @pytest.mark.asyncio
+    async def test_cached_exchanges_share_http_session(self):
+        """测试各账户的缓存实例共用一个aiohttp会话，由close_all_exchanges统一关闭"""
+        spot = BinanceExchangeFactory.create_exchange({'api_key': 'key_a', 'secret': 'secret'})
+        future = BinanceExchangeFactory.create_exchange({'api_key': 'key_b', 'secret': 'secret'}, 'future')
+        spot.open()
+        future.open()
+        
+        session = spot.session
+        assert future.session is session
+        
+        await BinanceExchangeFactory.close_all_exchanges()
+        assert session.closed
+    
+    def test_keyed_hmac_matches_ccxt_signature(self):
+        """测试预初始化的HMAC签名与ccxt原签名一致"""
+        exchange = BinanceExchangeFactory.create_exchange({'api_key': 'key', 'secret': 'secret'})
+        query = b'symbol=BTCUSDT&timestamp=1640995200000&recvWindow=5000'
+        
+        assert exchange.hmac(query, b'secret', hashlib.sha256) == ccxt.Exchange.hmac(query, b'secret', hashlib.sha256)
+        assert exchange.hmac(query, b'other', hashlib.sha256) == ccxt.Exchange.hmac(query, b'other', hashlib.sha256)
+    
+    def test_pooled_connections_enable_tcp_keepalive(self):
+        """测试连接池创建的socket开启了TCP keepalive"""
+        import socket
+        
+        sock = BinanceExchangeFactory._create_keepalive_socket(
+            (socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_TCP, '', ('127.0.0.1', 443))
+        )
+        try:
+            assert sock.getsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE)
+            if hasattr(socket, 'TCP_KEEPIDLE'):
+                assert sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE) == BinanceExchangeFactory.TCP_KEEPALIVE_IDLE
+        finally:
+            sock.close()
+    
+    @pytest.mark.asyncio
+    @patch('ccxt.async_support.binance')
+    async def test_cached_exchanges_share_loaded_markets(self, mock_binance_class):
+        """测试同一环境的缓存实例只加载一次markets"""
+        base_loads = []
+        
+        def create(config):
+            exchange = Mock(options={'broker': BinanceExchangeFactory.BROKER_IDS.copy()}, markets=None, currencies=None)
+            
+            async def load_markets(reload=False, params={}):
+                await asyncio.sleep(0)
+                exchange.markets = {'BTC/USDT': {'id': 'BTCUSDT'}}
+                exchange.currencies = {'BTC': {}}
+            
+            exchange.load_markets = AsyncMock(side_effect=load_markets)
+            base_loads.append(exchange.load_markets)
+            return exchange
+        
+        mock_binance_class.side_effect = create
+        
+        spot = BinanceExchangeFactory.create_exchange({'api_key': 'key_a', 'secret': 'secret'})
+        future = BinanceExchangeFactory.create_exchange({'api_key': 'key_b', 'secret': 'secret'}, 'future')
+        await asyncio.gather(spot.load_markets(), future.load_markets())
+        
+        assert sum(load.await_count for load in base_loads) == 1
+        future.set_markets.assert_called_once_with({'BTC/USDT': {'id': 'BTCUSDT'}}, {'BTC': {}})
+        
+        # 重新加载只请求一次，并更新同一环境的其他实例
+        assert await BinanceExchangeFactory.reload_markets() == 1
+        assert sum(load.await_count for load in base_loads) == 2
+        assert future.set_markets.call_count == 2
+    
+    @pytest.mark.asyncio
+    @patch('ccxt.async_support.binance')
+    async def test_public_market_load_does_not_share_currencies(self, mock_binance_class):
+        """测试公共实例加载的markets不带币种信息，带凭证的实例只加载一次完整币种信息"""
+        def create(config):
+            exchange = Mock(options={'broker': BinanceExchangeFactory.BROKER_IDS.copy()}, markets=None, currencies=None)
+            exchange.check_required_credentials.return_value = 'apiKey' in config
+            exchange.fetch_currencies = AsyncMock(return_value={'BTC': {'networks': {'BTC': {}}}})
+            
+            async def load_markets(reload=False, params={}):
+                exchange.markets = {'BTC/USDT': {'id': 'BTCUSDT'}}
+                exchange.currencies = {'BTC': {}}
+            
+            exchange.load_markets = AsyncMock(side_effect=load_markets)
+            return exchange
+        
+        mock_binance_class.side_effect = create
+        
+        public = BinanceExchangeFactory.create_public_exchange()
+        await public.load_markets()
+        spot = BinanceExchangeFactory.create_exchange({'api_key': 'key_a', 'secret': 'secret'})
+        future = BinanceExchangeFactory.create_exchange({'api_key': 'key_a', 'secret': 'secret'}, 'future')
+        await asyncio.gather(spot.load_markets(), future.load_markets())
+        
+        currencies = {'BTC': {'networks': {'BTC': {}}}}
+        spot.set_markets.assert_called_once_with({'BTC/USDT': {'id': 'BTCUSDT'}}, currencies)
+        future.set_markets.assert_called_once_with({'BTC/USDT': {'id': 'BTCUSDT'}}, currencies)
+        assert spot.fetch_currencies.await_count + future.fetch_currencies.await_count == 1
@@ -135,6 +135,80 @@ class TestConfigManager:
         # 不存在的账户
         assert config_manager.validate_account("nonexistent") is False
     
+    def test_get_account_caches_decryption(self, config_manager):
+        """测试账户解密结果缓存及更新后失效"""
+        config_manager.add_account("test_account", "key", "secret")
+        
+        with patch.object(
+            config_manager, '_decrypt_account_fields', wraps=config_manager._decrypt_account_fields
+        ) as mock_decrypt:
+            config_manager.get_account("test_account")
+            config_manager.get_account("test_account")
+            assert mock_decrypt.call_count == 1
+            
+            config_manager.update_account("test_account", api_key="new_key")
+            assert config_manager.get_account("test_account")["api_key"] == "new_key"
+            assert mock_decrypt.call_count == 2
+    
+    def test_list_accounts_invalidated_on_save(self, config_manager):
+        """测试list_accounts结果在配置保存后刷新"""
+        config_manager.add_account("account_a", "key", "secret")
+        first = config_manager.list_accounts()
+        assert config_manager.list_accounts() is first
+        
+        config_manager.add_account("account_b", "key", "secret")
+        assert set(config_manager.list_accounts()) == {"account_a", "account_b"}
+    
+    def test_summarize_accounts_without_decrypt(self, config_manager):
+        """测试账户汇总不触发解密"""
+        config_manager.add_account("test_account", "key", "secret", True, "测试账户")
+        config_manager._config["accounts"]["broken_account"] = {"api_key": "", "secret": "x", "sandbox": False}
+        
+        with patch.object(config_manager, '_decrypt_account_fields') as mock_decrypt:
+            summary = config_manager.summarize_accounts()
+            mock_decrypt.assert_not_called()
+        
+        assert summary["test_account"]["valid"] is True
+        assert summary["test_account"]["sandbox"] is True
+        assert summary["test_account"]["description"] == "测试账户"
+        assert summary["broken_account"]["valid"] is False
+    
+    def test_is_portfolio_margin_without_decrypt(self, config_manager):
+        """测试读取统一账户标志不触发解密"""
+        config_manager.add_account("test_account", "key", "secret")
+        config_manager._config["accounts"]["test_account"]["portfolio_margin"] = True
+        
+        with patch.object(config_manager, '_decrypt_account_fields') as mock_decrypt:
+            assert config_manager.is_portfolio_margin("test_account") is True
+            mock_decrypt.assert_not_called()
+        
+        with pytest.raises(ValueError, match="不存在"):
+            config_manager.is_portfolio_margin("nonexistent")
+    
+    def test_legacy_fernet_values_migrated(self, config_manager):
+        """测试旧版Fernet密文可解密且读取不修改配置，显式迁移时升级为SecretBox密文"""
+        from cryptography.fernet import Fernet
+        legacy = Fernet(config_manager._key)
+        config_manager._config["accounts"]["legacy_account"] = {
+            "api_key": legacy.encrypt(b"legacy_key").decode(),
+            "secret": legacy.encrypt(b"legacy_secret").decode(),
+            "sandbox": False,
+        }
+        
+        stored_before = dict(config_manager._config["accounts"]["legacy_account"])
+        account = config_manager.get_account("legacy_account")
+        assert account["api_key"] == "legacy_key"
+        assert account["secret"] == "legacy_secret"
+        assert config_manager._config["accounts"]["legacy_account"] == stored_before
+        
+        assert config_manager.migrate_legacy_encryption() == 1
+        assert config_manager.migrate_legacy_encryption() == 0
+        with open(config_manager.config_file, 'r', encoding='utf-8') as f:
+            stored = json.load(f)["accounts"]["legacy_account"]
+        assert not stored["api_key"].startswith("gAAAAA")
+        assert config_manager.decrypt_value(stored["secret"]) == "legacy_secret"
+        assert config_manager.get_account("legacy_account")["api_key"] == "legacy_key"
+    
     def test_server_config(self, config_manager):
         """测试服务器配置管理"""
         # 获取默认配置
@@ -183,6 +257,17 @@ class TestConfigManager:
         assert "accounts" in backup_data
         assert "test_account" in backup_data["accounts"]
     
+    def test_save_config_is_atomic_and_private(self, config_manager):
+        """测试配置原子写入且权限为0600"""
+        config_manager.add_account("test_account", "key", "secret")
+        
+        config_file = config_manager.config_file
+        assert (config_file.stat().st_mode & 0o777) == 0o600
+        assert not config_file.with_suffix('.json.tmp').exists()
+        
+        with open(config_file, 'r', encoding='utf-8') as f:
+            assert "test_account" in json.load(f)["accounts"]
+    
     def test_encryption_key_generation(self, temp_config_dir):
         """测试加密密钥生成和持久化"""
         with patch('binance_mcp.config.Path.home', return_value=temp_config_dir):
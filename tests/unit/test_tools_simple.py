@@ -2,11 +2,22 @@
 简化的MCP工具模块单元测试
 """
 
+import asyncio
+import base64
+import json
+import math
+import struct
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs
+
 import pytest
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, Mock, patch
 import ccxt
 
-from binance_mcp.tools import BinanceMCPTools, handle_ccxt_error
+from binance_mcp.broker import BinanceExchangeFactory, exchange_factory
+from binance_mcp.log_context import get_call_id
+from binance_mcp.tools import BinanceMCPTools, MarketDataStream, OrderRateLimiter, handle_ccxt_error
 
 
 @pytest.mark.unit
@@ -47,7 +58,136 @@ class TestBinanceMCPTools:
         assert result == mock_exchange
         mock_create_exchange.assert_called_once()
     
-    def test_create_spot_order_success(self, tools_with_mock_exchange):
+    def test_get_available_tools(self, config_manager):
+        """测试工具列表只包含对外提供的工具方法"""
+        tools = BinanceMCPTools(config_manager).get_available_tools()
+        
+        assert 'get_ticker' in tools
+        assert 'create_spot_order' in tools
+        assert 'get_available_tools' not in tools
+        assert 'close_exchanges' not in tools
+    
+    def test_market_data_environment_follows_accounts(self, config_manager):
+        """测试行情环境未配置账户时为正式网，账户列表变化后重新判断"""
+        tools = BinanceMCPTools(config_manager)
+        assert tools._get_market_sandbox() is False
+        
+        config_manager.add_account('sandbox_account', 'test_api_key_123', 'test_secret_456', True)
+        assert tools._get_market_sandbox() is True
+        
+        config_manager.remove_account('sandbox_account')
+        config_manager.add_account('live_account', 'test_api_key_123', 'test_secret_456', False)
+        assert tools._get_market_sandbox() is False
+    
+    def test_public_exchange_needs_no_credentials(self, config_manager):
+        """测试公共行情实例不带凭证，按环境和市场类型缓存"""
+        tools = BinanceMCPTools(config_manager)
+        spot = tools._get_public_exchange()
+        
+        assert not spot.apiKey and not spot.secret
+        assert tools._get_public_exchange() is spot
+        assert tools._get_public_exchange('future').options['defaultType'] == 'future'
+    
+    @patch('binance_mcp.tools.exchange_factory.create_exchange')
+    def test_get_exchange_per_market_type(self, mock_create_exchange, config_manager):
+        """测试同一账户的不同市场类型使用独立的exchange实例"""
+        config_manager.add_account('test_account', 'test_api_key_123', 'test_secret_456', True)
+        mock_create_exchange.side_effect = lambda config, market_type: Mock(market_type=market_type)
+        
+        tools = BinanceMCPTools(config_manager)
+        spot = tools._get_exchange('test_account')
+        future = tools._get_exchange('test_account', 'future')
+        
+        assert spot.market_type == 'spot'
+        assert future.market_type == 'future'
+        assert tools._get_exchange('test_account', 'future') is future
+        assert mock_create_exchange.call_count == 2
+    
+    @patch('binance_mcp.tools.exchange_factory.create_exchange')
+    def test_get_exchange_concurrent_miss_creates_once(self, mock_create_exchange, config_manager):
+        """测试多线程同时未命中缓存时只创建一个exchange实例"""
+        config_manager.add_account('test_account', 'test_api_key_123', 'test_secret_456', True)
+        
+        def slow_create(config, market_type):
+            time.sleep(0.01)
+            return Mock()
+        
+        mock_create_exchange.side_effect = slow_create
+        tools = BinanceMCPTools(config_manager)
+        
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            exchanges = list(pool.map(lambda _: tools._get_exchange('test_account'), range(8)))
+        
+        assert mock_create_exchange.call_count == 1
+        assert all(exchange is exchanges[0] for exchange in exchanges)
+    
+    @pytest.mark.asyncio
+    @patch('binance_mcp.tools.exchange_factory.create_exchange')
+    async def test_portfolio_margin_spot_exchange_cached(self, mock_create_exchange, config_manager):
+        """测试统一账户的现货余额查询复用同一个现货专用exchange实例"""
+        config_manager.add_account('test_account', 'test_api_key_123', 'test_secret_456', True)
+        config_manager._config['accounts']['test_account']['portfolio_margin'] = True
+        spot_exchange = Mock(fetch_balance=AsyncMock(return_value={'USDT': {'free': 1.0}}))
+        mock_create_exchange.side_effect = lambda config, market_type: (
+            Mock() if config.get('portfolio_margin') else spot_exchange
+        )
+        tools = BinanceMCPTools(config_manager)
+        
+        with patch.object(config_manager, 'get_account', wraps=config_manager.get_account) as get_account:
+            await tools.get_balance('test_account')
+            await tools.get_balance('test_account')
+            calls = get_account.call_count
+        
+        assert spot_exchange.fetch_balance.await_count == 2
+        assert tools._get_spot_only_exchange('test_account') is spot_exchange
+        assert calls == 2  # 主实例与现货专用实例各解密一次配置
+    
+    @pytest.mark.asyncio
+    @patch('binance_mcp.tools.exchange_factory.create_exchange')
+    async def test_portfolio_margin_balance_conversion(self, mock_create_exchange, config_manager):
+        """测试统一账户衍生品余额转换为ccxt格式"""
+        config_manager.add_account('test_account', 'test_api_key_123', 'test_secret_456', True)
+        config_manager._config['accounts']['test_account']['portfolio_margin'] = True
+        exchange = Mock(papi_get_balance=AsyncMock(return_value=[
+            {'asset': 'USDT', 'crossMarginFree': '10', 'umWalletBalance': '5',
+             'cmWalletBalance': '0', 'totalWalletBalance': '20'},
+            {'asset': 'BNB', 'crossMarginFree': '2', 'totalWalletBalance': '1'},
+            {'crossMarginFree': '1'},
+        ]))
+        mock_create_exchange.return_value = exchange
+        tools = BinanceMCPTools(config_manager)
+        
+        result = await tools.get_balance('test_account', 'future')
+        
+        assert set(result) == {'USDT', 'BNB'}
+        assert result['USDT']['free'] == 15.0
+        assert result['USDT']['used'] == 5.0
+        assert result['USDT']['total'] == 20.0
+        assert result['BNB']['used'] == 0
+        assert result['BNB']['umWalletBalance'] == 0.0
+    
+    @pytest.mark.asyncio
+    @patch('binance_mcp.tools.exchange_factory.create_exchange')
+    async def test_portfolio_margin_futures_order_params(self, mock_create_exchange, config_manager):
+        """测试统一账户期货下单参数（方向与类型大小写不敏感）"""
+        config_manager.add_account('test_account', 'test_api_key_123', 'test_secret_456', True)
+        config_manager._config['accounts']['test_account']['portfolio_margin'] = True
+        exchange = Mock(papiPostUmOrder=AsyncMock(return_value={'orderId': 1}))
+        mock_create_exchange.return_value = exchange
+        tools = BinanceMCPTools(config_manager)
+        
+        await tools.create_contract_order('test_account', 'BTC/USDT', 'Sell', 0.01, 'Market', 50000)
+        
+        exchange.papiPostUmOrder.assert_awaited_once_with({
+            'symbol': 'BTCUSDT',
+            'side': 'SELL',
+            'type': 'MARKET',
+            'quantity': 0.01,
+            'positionSide': 'SHORT'
+        })
+    
+    @pytest.mark.asyncio
+    async def test_create_spot_order_success(self, tools_with_mock_exchange):
         """测试成功创建现货订单"""
         mock_exchange = tools_with_mock_exchange._get_exchange('test_account')
         mock_exchange.create_order.return_value = {
@@ -60,7 +200,7 @@ class TestBinanceMCPTools:
             'status': 'open'
         }
         
-        result = tools_with_mock_exchange.create_spot_order(
+        result = await tools_with_mock_exchange.create_spot_order(
             account_id='test_account',
             symbol='BTC/USDT',
             side='buy',
@@ -73,11 +213,28 @@ class TestBinanceMCPTools:
         assert result['symbol'] == 'BTC/USDT'
         assert result['side'] == 'buy'
         
-        mock_exchange.create_order.assert_called_once_with(
+        mock_exchange.create_order.assert_awaited_once_with(
             'BTC/USDT', 'limit', 'buy', 0.01, 50000, {}
         )
     
-    def test_cancel_order_success(self, tools_with_mock_exchange):
+    @pytest.mark.asyncio
+    async def test_create_oco_order_uses_spot_oco_endpoint(self, tools_with_mock_exchange):
+        """测试OCO订单请求Binance现货OCO接口，止损限价单带上有效方式"""
+        mock_exchange = tools_with_mock_exchange._get_exchange('test_account')
+        mock_exchange.private_post_order_oco = AsyncMock(return_value={'orderListId': 1})
+        
+        result = await tools_with_mock_exchange.create_oco_order(
+            'test_account', 'BTC/USDT', 'sell', 0.1, 52000.0, 48000.0, 47900.0
+        )
+        
+        assert result == {'orderListId': 1}
+        mock_exchange.private_post_order_oco.assert_awaited_once_with({
+            'symbol': 'BTCUSDT', 'side': 'SELL', 'quantity': 0.1, 'price': 52000.0,
+            'stopPrice': 48000.0, 'stopLimitPrice': 47900.0, 'stopLimitTimeInForce': 'GTC'
+        })
+    
+    @pytest.mark.asyncio
+    async def test_cancel_order_success(self, tools_with_mock_exchange):
         """测试成功取消订单"""
         mock_exchange = tools_with_mock_exchange._get_exchange('test_account')
         mock_exchange.cancel_order.return_value = {
@@ -85,7 +242,7 @@ class TestBinanceMCPTools:
             'status': 'canceled'
         }
         
-        result = tools_with_mock_exchange.cancel_order(
+        result = await tools_with_mock_exchange.cancel_order(
             account_id='test_account',
             order_id='test_order_123',
             symbol='BTC/USDT'
@@ -98,7 +255,8 @@ class TestBinanceMCPTools:
             'test_order_123', 'BTC/USDT', {}
         )
     
-    def test_get_balance_success(self, tools_with_mock_exchange):
+    @pytest.mark.asyncio
+    async def test_get_balance_success(self, tools_with_mock_exchange):
         """测试成功获取余额"""
         mock_exchange = tools_with_mock_exchange._get_exchange('test_account')
         mock_exchange.fetch_balance.return_value = {
@@ -106,7 +264,7 @@ class TestBinanceMCPTools:
             'USDT': {'free': 10000.0, 'used': 0.0, 'total': 10000.0}
         }
         
-        result = tools_with_mock_exchange.get_balance('test_account')
+        result = await tools_with_mock_exchange.get_balance('test_account')
         
         assert 'BTC' in result
         assert 'USDT' in result
@@ -115,7 +273,8 @@ class TestBinanceMCPTools:
         
         mock_exchange.fetch_balance.assert_called_once()
     
-    def test_get_ticker_success(self, tools_with_mock_exchange):
+    @pytest.mark.asyncio
+    async def test_get_ticker_success(self, tools_with_mock_exchange):
         """测试成功获取价格行情"""
         # get_ticker会自动使用第一个配置的账户
         mock_exchange = tools_with_mock_exchange._get_exchange('test_account')
@@ -127,7 +286,7 @@ class TestBinanceMCPTools:
             'volume': 12345.67
         }
         
-        result = tools_with_mock_exchange.get_ticker(symbol='BTC/USDT')
+        result = await tools_with_mock_exchange.get_ticker(symbol='BTC/USDT')
         
         assert result['symbol'] == 'BTC/USDT'
         assert result['last'] == 50000
@@ -135,6 +294,523 @@ class TestBinanceMCPTools:
         assert result['ask'] == 50001
         
         mock_exchange.fetch_ticker.assert_called_once_with('BTC/USDT', {})
+    
+    @pytest.mark.asyncio
+    async def test_get_ticker_uses_short_ttl_cache(self, tools_with_mock_exchange):
+        """测试TTL内重复查询行情只请求一次"""
+        mock_exchange = tools_with_mock_exchange._get_exchange('test_account')
+        
+        first = await tools_with_mock_exchange.get_ticker('BTC/USDT')
+        second = await tools_with_mock_exchange.get_ticker('BTC/USDT')
+        assert first == second
+        mock_exchange.fetch_ticker.assert_awaited_once()
+        
+        # 不同交易对、带额外参数或缓存过期时重新请求
+        await tools_with_mock_exchange.get_ticker('ETH/USDT')
+        await tools_with_mock_exchange.get_ticker('BTC/USDT', type='future')
+        # 将缓存写入时间提前（不能patch time.monotonic，事件循环的计时器也依赖它）
+        cache = tools_with_mock_exchange._market_data_cache
+        for key, (stored_at, data) in list(cache.items()):
+            cache[key] = (stored_at - 1, data)
+        await tools_with_mock_exchange.get_ticker('BTC/USDT')
+        assert mock_exchange.fetch_ticker.await_count == 4
+        
+        # no_cache跳过缓存
+        await tools_with_mock_exchange.get_ticker('BTC/USDT', no_cache=True)
+        assert mock_exchange.fetch_ticker.await_count == 5
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_queries_share_request(self, tools_with_mock_exchange):
+        """测试并发的相同行情查询只发起一次请求"""
+        mock_exchange = tools_with_mock_exchange._get_exchange('test_account')
+        
+        async def slow_order_book(symbol, limit, params):
+            await asyncio.sleep(0.01)
+            return {'symbol': symbol, 'bids': [], 'asks': []}
+        
+        mock_exchange.fetch_order_book.side_effect = slow_order_book
+        
+        results = await asyncio.gather(*(
+            tools_with_mock_exchange.get_order_book('BTC/USDT') for _ in range(3)
+        ))
+        
+        assert all(result['symbol'] == 'BTC/USDT' for result in results)
+        mock_exchange.fetch_order_book.assert_awaited_once()
+        assert tools_with_mock_exchange._inflight_market_data == {}
+    
+    @pytest.mark.asyncio
+    async def test_batch_create_futures_orders_splits_into_batches(self, tools_with_mock_exchange):
+        """测试批量期货下单按每批5单调用批量接口，结果保持顺序"""
+        mock_exchange = tools_with_mock_exchange._get_exchange('test_account')
+        mock_exchange.options = {}
+        mock_exchange.create_orders.side_effect = lambda orders: [{'id': order['amount']} for order in orders]
+        
+        orders = [
+            {'symbol': 'BTCUSDT', 'type': 'limit', 'side': 'buy', 'amount': amount, 'price': 50000}
+            for amount in range(1, 8)
+        ]
+        result = await tools_with_mock_exchange.batch_create_orders('test_account', orders)
+        
+        assert [order['id'] for order in result] == list(range(1, 8))
+        assert mock_exchange.create_orders.await_count == 2
+    
+    @pytest.mark.asyncio
+    async def test_batch_create_futures_orders_reports_rejected(self, tools_with_mock_exchange):
+        """测试批量期货下单默认限价单，被拒绝的订单在对应位置返回rejected条目"""
+        mock_exchange = tools_with_mock_exchange._get_exchange('test_account')
+        mock_exchange.exceptions = {'linear': {'exact': {'-2019': ccxt.InsufficientFunds}}, 'exact': {}}
+        mock_exchange.create_orders.return_value = [
+            {'id': '1'},
+            {'info': {'code': -2019, 'msg': 'Margin is insufficient.'}, 'status': 'rejected'},
+        ]
+        
+        orders = [
+            {'symbol': 'BTCUSDT', 'side': 'buy', 'amount': amount, 'price': 50000}
+            for amount in (1, 2)
+        ]
+        result = await tools_with_mock_exchange.batch_create_orders('test_account', orders)
+        
+        assert [order['type'] for order in mock_exchange.create_orders.await_args.args[0]] == ['limit', 'limit']
+        assert result[0] == {'id': '1'}
+        assert result[1] == {
+            'status': 'rejected',
+            'symbol': 'BTCUSDT',
+            'side': 'buy',
+            'amount': 2,
+            'error_type': 'InsufficientFunds',
+            'error': 'binance Margin is insufficient.',
+        }
+    
+    @pytest.mark.asyncio
+    async def test_get_klines_raw_uses_native_endpoint(self, tools_with_mock_exchange):
+        """测试raw模式直接请求Binance原始K线接口"""
+        mock_exchange = tools_with_mock_exchange._get_exchange('test_account')
+        raw_klines = [[1640995200000, "47000.00", "47500.00", "46800.00", "47200.00", "100.5"]]
+        mock_exchange.publicGetKlines = AsyncMock(return_value=raw_klines)
+        
+        result = await tools_with_mock_exchange.get_klines('BTC/USDT', '1m', 1640995200000, 500, raw=True)
+        
+        assert result is raw_klines
+        mock_exchange.publicGetKlines.assert_awaited_once_with({
+            'symbol': 'BTCUSDT', 'interval': '1m', 'limit': 500, 'startTime': 1640995200000
+        })
+        mock_exchange.fetch_ohlcv.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_get_klines_packed_as_float64_matrix(self, tools_with_mock_exchange):
+        """测试packed模式返回可直接还原的float64矩阵"""
+        mock_exchange = tools_with_mock_exchange._get_exchange('test_account')
+        mock_exchange.fetch_ohlcv = AsyncMock(return_value=[
+            [1640995200000, 47000.0, 47500.0, 46800.0, 47200.0, 100.5],
+            [1640995260000, 47200.0, 47300.0, 47100.0, 47250.0, None],
+        ])
+        
+        result = await tools_with_mock_exchange.get_klines('BTC/USDT', '1m', packed=True)
+        
+        assert result['columns'] == ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+        assert result['shape'] == [2, 6]
+        values = struct.unpack('<12d', base64.b64decode(result['data_b64']))
+        assert values[:6] == (1640995200000, 47000.0, 47500.0, 46800.0, 47200.0, 100.5)
+        assert math.isnan(values[11])
+    
+    @pytest.mark.asyncio
+    async def test_get_klines_rejects_unknown_timeframe(self, tools_with_mock_exchange):
+        """测试无效K线周期在请求前以BadRequest拒绝，并列出可选周期"""
+        mock_exchange = tools_with_mock_exchange._get_exchange('test_account')
+        
+        with pytest.raises(ccxt.BadRequest, match='不支持的K线周期: 2h，可选: 1m, 5m, 1h, 1d'):
+            await tools_with_mock_exchange.get_klines('BTC/USDT', '2h')
+        mock_exchange.fetch_ohlcv.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_get_tickers_uses_single_request(self, tools_with_mock_exchange):
+        """测试批量行情一次fetch_tickers请求，交易对顺序不同也命中缓存"""
+        mock_exchange = tools_with_mock_exchange._get_exchange('test_account')
+        mock_exchange.fetch_tickers = AsyncMock(return_value={'BTC/USDT': {'last': 1}, 'ETH/USDT': {'last': 2}})
+        
+        first = await tools_with_mock_exchange.get_tickers(['BTC/USDT', 'ETH/USDT'])
+        second = await tools_with_mock_exchange.get_tickers(['ETH/USDT', 'BTC/USDT'])
+        
+        assert first is second
+        mock_exchange.fetch_tickers.assert_awaited_once_with(['BTC/USDT', 'ETH/USDT'], {})
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_tickers_fetched_in_one_request(self, tools_with_mock_exchange):
+        """测试并发查询不同交易对的行情合并为一次fetch_tickers请求"""
+        mock_exchange = tools_with_mock_exchange._get_exchange('test_account')
+        mock_exchange.fetch_tickers.side_effect = lambda symbols: {
+            symbol: {'symbol': symbol} for symbol in symbols
+        }
+        
+        results = await asyncio.gather(*(
+            tools_with_mock_exchange.get_ticker(symbol) for symbol in ('BTC/USDT', 'ETH/USDT', 'BNB/USDT')
+        ))
+        
+        assert [result['symbol'] for result in results] == ['BTC/USDT', 'ETH/USDT', 'BNB/USDT']
+        mock_exchange.fetch_tickers.assert_awaited_once()
+        mock_exchange.fetch_ticker.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_preload_markets_once_per_environment(self, config_manager):
+        """测试预加载通过公共实例按环境（正式/沙盒）各加载一次markets"""
+        config_manager.add_account('sandbox_1', 'key', 'secret', True)
+        config_manager.add_account('sandbox_2', 'key', 'secret', True)
+        config_manager.add_account('live', 'key', 'secret', False)
+        tools = BinanceMCPTools(config_manager)
+        exchanges = {True: Mock(load_markets=AsyncMock()), False: Mock(load_markets=AsyncMock())}
+        
+        with patch('binance_mcp.tools.exchange_factory.create_public_exchange', side_effect=exchanges.get), \
+                patch('binance_mcp.tools.exchange_factory.create_exchange') as create_exchange:
+            await tools.preload_markets()
+        
+        exchanges[True].load_markets.assert_awaited_once()
+        exchanges[False].load_markets.assert_awaited_once()
+        create_exchange.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_preload_markets_without_accounts(self, config_manager):
+        """测试未配置账户时仍为行情工具预加载正式网markets"""
+        tools = BinanceMCPTools(config_manager)
+        exchange = Mock(load_markets=AsyncMock())
+        
+        with patch('binance_mcp.tools.exchange_factory.create_public_exchange', return_value=exchange) as create:
+            await tools.preload_markets()
+        
+        create.assert_called_once_with(False)
+        exchange.load_markets.assert_awaited_once()
+    
+    @pytest.mark.asyncio
+    async def test_markets_refreshed_periodically(self, config_manager):
+        """测试预加载后按间隔为各环境重新加载市场列表"""
+        config_manager.add_account('sandbox', 'key', 'secret', True)
+        tools = BinanceMCPTools(config_manager)
+        tools.MARKETS_REFRESH_INTERVAL = 0
+        reloads = []
+        refreshed = asyncio.Event()
+        
+        async def reload_markets(sandbox):
+            reloads.append(sandbox)
+            if len(reloads) >= 4:
+                refreshed.set()
+            return 1
+        
+        with patch('binance_mcp.tools.exchange_factory.create_public_exchange',
+                   return_value=Mock(load_markets=AsyncMock())), \
+                patch('binance_mcp.tools.exchange_factory.reload_markets', side_effect=reload_markets):
+            tools.start_preloading_markets()
+            await asyncio.wait_for(refreshed.wait(), timeout=1)
+            await tools.close_exchanges()
+        
+        # 账户在沙盒环境，行情工具跟随第一个账户，只刷新沙盒环境
+        assert set(reloads) == {True}
+        assert tools._preload_task is None
+    
+    @pytest.mark.asyncio
+    async def test_get_open_orders_multi(self, tools_with_mock_exchange):
+        """测试多交易对开放订单并发查询，按交易对返回"""
+        mock_exchange = tools_with_mock_exchange._get_exchange('test_account')
+        mock_exchange.fetch_open_orders.side_effect = lambda symbol: [{'symbol': symbol}]
+        
+        result = await tools_with_mock_exchange.get_open_orders_multi('test_account', ['BTC/USDT', 'ETH/USDT'])
+        
+        assert result == {'BTC/USDT': [{'symbol': 'BTC/USDT'}], 'ETH/USDT': [{'symbol': 'ETH/USDT'}]}
+        assert mock_exchange.fetch_open_orders.await_count == 2
+    
+    @pytest.mark.asyncio
+    async def test_close_position_closes_both_sides(self, tools_with_mock_exchange):
+        """测试双向持仓时多空两侧的平仓单合并为一次批量下单"""
+        mock_exchange = tools_with_mock_exchange._get_exchange('test_account')
+        mock_exchange.fetch_positions.return_value = [
+            {'side': 'long', 'contracts': 2},
+            {'side': 'short', 'contracts': 1},
+            {'side': 'long', 'contracts': 0},
+        ]
+        mock_exchange.create_orders = AsyncMock(side_effect=lambda orders: [
+            {'side': order['side'], 'amount': order['amount']} for order in orders
+        ])
+        
+        result = await tools_with_mock_exchange.close_position('test_account', 'BTCUSDT')
+        
+        assert result == {'closed_positions': [
+            {'side': 'sell', 'amount': 2},
+            {'side': 'buy', 'amount': 1},
+        ]}
+        mock_exchange.create_orders.assert_awaited_once()
+        orders = mock_exchange.create_orders.await_args.args[0]
+        assert [order['type'] for order in orders] == ['market', 'market']
+        assert all(order['params']['reduceOnly'] is True for order in orders)
+        # 每笔平仓单各占用一次下单额度
+        assert len(tools_with_mock_exchange._order_limiter._timestamps['test_account']) == 2
+    
+    @pytest.mark.asyncio
+    async def test_close_position_reports_rejected_side(self, tools_with_mock_exchange):
+        """测试平仓单被拒绝时在对应位置返回rejected条目，不抛出异常"""
+        mock_exchange = tools_with_mock_exchange._get_exchange('test_account')
+        mock_exchange.exceptions = {'linear': {'exact': {'-2022': ccxt.InvalidOrder}}, 'exact': {}}
+        mock_exchange.fetch_positions.return_value = [
+            {'side': 'long', 'contracts': 2},
+            {'side': 'short', 'contracts': 1},
+        ]
+        rejected = {'info': {'code': -2022, 'msg': 'ReduceOnly Order is rejected.'}, 'status': 'rejected'}
+        mock_exchange.create_orders = AsyncMock(return_value=[{'id': '1'}, rejected])
+        
+        result = await tools_with_mock_exchange.close_position('test_account', 'BTCUSDT')
+        
+        assert result['closed_positions'] == [{'id': '1'}, {
+            'status': 'rejected',
+            'symbol': 'BTCUSDT',
+            'side': 'buy',
+            'amount': 1,
+            'position_side': 'short',
+            'error_type': 'InvalidOrder',
+            'error': 'binance ReduceOnly Order is rejected.',
+        }]
+        
+        mock_exchange.create_orders = AsyncMock(return_value=[rejected, rejected])
+        result = await tools_with_mock_exchange.close_position('test_account', 'BTCUSDT')
+        
+        assert [entry['status'] for entry in result['closed_positions']] == ['rejected', 'rejected']
+    
+    @pytest.mark.asyncio
+    async def test_close_position_portfolio_margin_uses_papi(self, tools_with_mock_exchange):
+        """测试统一账户平仓走papi，按持仓方向指定positionSide且不带reduceOnly"""
+        tools_with_mock_exchange.config_manager._config['accounts']['test_account']['portfolio_margin'] = True
+        mock_exchange = tools_with_mock_exchange._get_exchange('test_account')
+        mock_exchange.fetch_positions.return_value = [
+            {'side': 'long', 'contracts': 2},
+            {'side': 'short', 'contracts': 1},
+        ]
+        mock_exchange.papiPostUmOrder = AsyncMock(side_effect=lambda order: {'orderId': order['positionSide']})
+        mock_exchange.create_orders = AsyncMock()
+        
+        result = await tools_with_mock_exchange.close_position('test_account', 'BTC/USDT:USDT')
+        
+        assert result == {'closed_positions': [{'orderId': 'LONG'}, {'orderId': 'SHORT'}]}
+        mock_exchange.create_orders.assert_not_awaited()
+        orders = [call.args[0] for call in mock_exchange.papiPostUmOrder.await_args_list]
+        assert [(order['side'], order['positionSide'], order['quantity']) for order in orders] == [
+            ('SELL', 'LONG', 2),
+            ('BUY', 'SHORT', 1),
+        ]
+        assert all(order['symbol'] == 'BTCUSDT' and 'reduceOnly' not in order for order in orders)
+    
+    @pytest.mark.asyncio
+    async def test_cancel_all_orders_without_symbol_fans_out(self, tools_with_mock_exchange):
+        """测试不指定交易对时按有挂单的交易对逐个撤销"""
+        mock_exchange = tools_with_mock_exchange._get_exchange('test_account')
+        mock_exchange.fetch_open_orders = AsyncMock(return_value=[
+            {'id': '1', 'symbol': 'BTC/USDT'},
+            {'id': '2', 'symbol': 'ETH/USDT'},
+            {'id': '3', 'symbol': 'BTC/USDT'},
+        ])
+        mock_exchange.cancel_all_orders = AsyncMock(side_effect=lambda symbol, params: [{'symbol': symbol}])
+        
+        result = await tools_with_mock_exchange.cancel_all_orders('test_account')
+        
+        assert result == [{'symbol': 'BTC/USDT'}, {'symbol': 'ETH/USDT'}]
+        assert mock_exchange.cancel_all_orders.await_count == 2
+    
+    @staticmethod
+    def _slow_create_order(mock_exchange):
+        """单笔下单在返回前让出事件循环，模拟进行中的请求"""
+        async def create_order(symbol, type, side, amount, price, params):
+            await asyncio.sleep(0.005)
+            return {'id': str(amount)}
+        
+        mock_exchange.create_order.side_effect = create_order
+    
+    @pytest.mark.asyncio
+    async def test_single_futures_order_sent_immediately(self, tools_with_mock_exchange):
+        """测试账户没有其他进行中的下单时立即单独发送，不等待合批窗口"""
+        mock_exchange = tools_with_mock_exchange._get_exchange('test_account')
+        tools_with_mock_exchange._futures_batcher.window = 10.0
+        
+        result = await asyncio.wait_for(
+            tools_with_mock_exchange.create_futures_order('test_account', 'BTCUSDT', 'buy', 1, 'limit', 50000),
+            timeout=1
+        )
+        
+        assert result['id'] == 'test_order_123'
+        mock_exchange.create_order.assert_awaited_once()
+        mock_exchange.create_orders.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_futures_orders_are_batched(self, tools_with_mock_exchange):
+        """测试已有下单进行中时，后续并发的期货下单合并为批量请求（每批最多5单）"""
+        mock_exchange = tools_with_mock_exchange._get_exchange('test_account')
+        mock_exchange.create_orders.side_effect = lambda orders: [
+            {'id': str(order['amount'])} for order in orders
+        ]
+        self._slow_create_order(mock_exchange)
+        
+        results = await asyncio.gather(*(
+            tools_with_mock_exchange.create_futures_order('test_account', 'BTCUSDT', 'buy', amount, 'limit', 50000)
+            for amount in range(1, 8)
+        ))
+        
+        # 第1单立即发送，第2-6单合并为一批，第7单单独发送
+        assert [result['id'] for result in results] == ['1', '2', '3', '4', '5', '6', '7']
+        mock_exchange.create_orders.assert_awaited_once()
+        assert [order['amount'] for order in mock_exchange.create_orders.await_args.args[0]] == [2, 3, 4, 5, 6]
+        assert mock_exchange.create_order.await_count == 2
+    
+    @pytest.mark.asyncio
+    async def test_batched_rejected_order_raises(self, tools_with_mock_exchange):
+        """测试批量下单中被拒绝的订单对其调用方抛出对应的ccxt异常"""
+        mock_exchange = tools_with_mock_exchange._get_exchange('test_account')
+        mock_exchange.exceptions = {'linear': {'exact': {'-2019': ccxt.InsufficientFunds}}, 'exact': {}}
+        mock_exchange.create_orders.side_effect = lambda orders: [
+            {'id': '2', 'status': 'open', 'info': {'orderId': 2}},
+            {'info': {'code': -2019, 'msg': 'Margin is insufficient.'}, 'status': 'rejected'},
+        ]
+        self._slow_create_order(mock_exchange)
+        
+        results = await asyncio.gather(*(
+            tools_with_mock_exchange.create_futures_order('test_account', 'BTCUSDT', 'buy', amount, 'limit', 50000)
+            for amount in (1, 2, 3)
+        ), return_exceptions=True)
+        
+        assert results[0]['id'] == '1'
+        assert results[1]['id'] == '2'
+        assert isinstance(results[2], ccxt.InsufficientFunds)
+        assert 'Margin is insufficient' in str(results[2])
+    
+    @pytest.mark.asyncio
+    async def test_batch_orders_carry_broker_client_order_id(self, config_manager):
+        """测试合并后的batchOrders请求中每笔订单都带有期货broker ID前缀的clientOrderId"""
+        config_manager.add_account('test_account', 'k' * 64, 's' * 64, False)
+        tools = BinanceMCPTools(config_manager)
+        exchange = tools._get_exchange('test_account', 'future')
+        exchange.set_markets([{
+            'id': 'BTCUSDT', 'symbol': 'BTC/USDT:USDT', 'base': 'BTC', 'quote': 'USDT', 'settle': 'USDT',
+            'baseId': 'BTC', 'quoteId': 'USDT', 'settleId': 'USDT', 'type': 'swap', 'spot': False,
+            'margin': False, 'swap': True, 'future': False, 'option': False, 'contract': True,
+            'linear': True, 'inverse': False, 'active': True, 'contractSize': 1,
+            'precision': {'amount': 0.001, 'price': 0.1},
+            'limits': {'amount': {'min': 0.001}, 'price': {}, 'cost': {}, 'market': {}},
+            'info': {'orderTypes': ['LIMIT', 'MARKET']},
+        }])
+        requests = []
+        
+        async def fetch(url, method='GET', headers=None, body=None):
+            requests.append((url, body))
+            await asyncio.sleep(0.005)
+            if 'batchOrders' in url:
+                return [{'orderId': index, 'status': 'NEW'} for index in range(body.count('newClientOrderId'))]
+            return {'orderId': 0, 'status': 'NEW'}
+        
+        try:
+            with patch.object(exchange, 'fetch', side_effect=fetch):
+                await asyncio.gather(*(
+                    tools.create_futures_order('test_account', 'BTC/USDT:USDT', 'buy', 0.01, 'limit', price)
+                    for price in (50000, 50100, 50200)
+                ))
+        finally:
+            await exchange_factory.close_all_exchanges()
+        
+        batch_bodies = [body for url, body in requests if url.endswith('/fapi/v1/batchOrders')]
+        assert len(batch_bodies) == 1
+        batch_orders = json.loads(parse_qs(batch_bodies[0])['batchOrders'][0])
+        broker_id = BinanceExchangeFactory.BROKER_IDS['future']
+        assert len(batch_orders) == 2
+        assert all(order['newClientOrderId'].startswith(broker_id) for order in batch_orders)
+
+
+@pytest.mark.unit
+class TestOrderRateLimiter:
+    """测试按账户的下单频率限制"""
+    
+    @pytest.mark.asyncio
+    async def test_acquire_waits_when_window_full(self):
+        """测试窗口内下单数达到上限时等待"""
+        limiter = OrderRateLimiter(max_orders=2, window=0.05)
+        
+        start = time.monotonic()
+        await limiter.acquire('account_a')
+        await limiter.acquire('account_a')
+        # 其他账户不受影响
+        await limiter.acquire('account_b')
+        assert time.monotonic() - start < 0.05
+        
+        await limiter.acquire('account_a')
+        assert time.monotonic() - start >= 0.05
+
+
+@pytest.mark.unit
+class TestMarketDataStream:
+    """测试行情websocket订阅"""
+    
+    @staticmethod
+    def _ws_exchange():
+        ws_exchange = Mock(tickers={})
+        
+        async def watch_tickers():
+            await asyncio.sleep(0)
+            changed = {
+                'BTC/USDT': {'symbol': 'BTC/USDT', 'last': 50000},
+                'ETH/USDT': {'symbol': 'ETH/USDT', 'last': 3000},
+            }
+            ws_exchange.tickers.update(changed)
+            return changed
+        
+        ws_exchange.watch_tickers.side_effect = watch_tickers
+        ws_exchange.safe_symbol.side_effect = lambda symbol: symbol
+        ws_exchange.close = AsyncMock()
+        return ws_exchange
+    
+    @pytest.mark.asyncio
+    async def test_repeated_queries_subscribe_and_serve_from_memory(self):
+        """测试重复查询后订阅全市场行情，之后任意交易对都直接返回推送的最新数据"""
+        stream = MarketDataStream(enabled=True)
+        ws_exchange = stream._exchanges[False] = self._ws_exchange()
+        
+        assert stream.get('ticker', 'BTC/USDT') is None
+        assert stream.get('ticker', 'BTC/USDT') is None
+        await asyncio.sleep(0.01)
+        assert stream.get('ticker', 'BTC/USDT') == {'symbol': 'BTC/USDT', 'last': 50000}
+        assert stream.get('ticker', 'ETH/USDT') == {'symbol': 'ETH/USDT', 'last': 3000}
+        # 测试网使用独立的订阅，不返回正式网的数据
+        assert stream.get('ticker', 'BTC/USDT', sandbox=True) is None
+        
+        await stream.close()
+        ws_exchange.close.assert_awaited_once()
+        assert stream.get('ticker', 'BTC/USDT') is None
+    
+    @pytest.mark.asyncio
+    async def test_stale_data_falls_back(self):
+        """测试推送数据超过MAX_AGE未更新时返回None（调用方回退到REST）"""
+        stream = MarketDataStream(enabled=True)
+        stream._exchanges[False] = self._ws_exchange()
+        stream.get('ticker', 'BTC/USDT')
+        stream.get('ticker', 'BTC/USDT')
+        await asyncio.sleep(0.01)
+        
+        stream._received[('ticker', 'BTC/USDT', False)] -= stream.MAX_AGE['ticker'] + 1
+        
+        assert stream.get('ticker', 'BTC/USDT') is None
+        assert stream.get('ticker', 'ETH/USDT') is not None
+        await stream.close()
+    
+    def test_disabled_by_default(self, config_manager):
+        """测试未在服务配置中启用时不订阅"""
+        stream = BinanceMCPTools(config_manager)._market_stream
+        
+        for _ in range(stream.SUBSCRIBE_AFTER + 1):
+            assert stream.get('ticker', 'BTC/USDT') is None
+        assert stream._tasks == {}
+    
+    @pytest.mark.asyncio
+    async def test_no_cache_skips_stream(self, tools_with_mock_exchange):
+        """测试no_cache查询不读取websocket推送"""
+        stream = tools_with_mock_exchange._market_stream
+        stream.get = Mock(return_value={'symbol': 'BTC/USDT', 'last': 1})
+        mock_exchange = tools_with_mock_exchange._get_public_exchange()
+        mock_exchange.fetch_ticker.return_value = {'symbol': 'BTC/USDT', 'last': 2}
+        
+        result = await tools_with_mock_exchange.get_ticker('BTC/USDT', no_cache=True)
+        
+        assert result['last'] == 2
+        stream.get.assert_not_called()
 
 
 @pytest.mark.unit
@@ -173,6 +849,16 @@ class TestHandleCcxtError:
         
         assert "API密钥无效" in str(exc_info.value)
     
+    def test_handle_ccxt_error_logs_positional_args(self, caplog):
+        """测试按位置传入的account_id/symbol也出现在错误日志中"""
+        @handle_ccxt_error
+        def test_function(account_id, symbol):
+            raise ccxt.BadSymbol("无效交易对")
+        
+        with pytest.raises(ccxt.BadSymbol):
+            test_function('acc1', 'FOO/BAR')
+        assert "account_id=acc1 symbol=FOO/BAR" in caplog.text
+    
     def test_handle_ccxt_error_decorator_generic_error(self):
         """测试通用错误处理"""
         @handle_ccxt_error
@@ -182,30 +868,99 @@ class TestHandleCcxtError:
         # 非ccxt错误会被包装成RuntimeError
         with pytest.raises(RuntimeError, match="工具执行失败"):
             test_function()
+    
+    def test_handle_ccxt_error_keeps_cause_and_wraps_once(self):
+        """测试包装的错误保留原始异常，嵌套工具调用不重复包装"""
+        @handle_ccxt_error
+        def inner():
+            raise ValueError("普通错误")
+        
+        @handle_ccxt_error
+        def outer():
+            return inner()
+        
+        with pytest.raises(RuntimeError) as exc_info:
+            outer()
+        
+        assert str(exc_info.value) == "工具执行失败: 普通错误"
+        assert isinstance(exc_info.value.__cause__, ValueError)
+    
+    @pytest.mark.asyncio
+    async def test_handle_ccxt_error_decorator_async_function(self):
+        """测试装饰器对协程函数的错误处理"""
+        @handle_ccxt_error
+        async def ccxt_failure():
+            raise ccxt.InsufficientFunds("余额不足")
+        
+        @handle_ccxt_error
+        async def generic_failure():
+            raise ValueError("普通错误")
+        
+        # ccxt错误保持原始类型，其他错误包装成RuntimeError
+        with pytest.raises(ccxt.InsufficientFunds, match="余额不足"):
+            await ccxt_failure()
+        with pytest.raises(RuntimeError, match="工具执行失败"):
+            await generic_failure()
+    
+    @pytest.mark.asyncio
+    async def test_async_tool_call_gets_correlation_id(self):
+        """测试每次工具调用分配关联ID，嵌套调用沿用外层ID"""
+        @handle_ccxt_error
+        async def inner():
+            return get_call_id()
+        
+        @handle_ccxt_error
+        async def outer():
+            return get_call_id(), await inner()
+        
+        outer_id, inner_id = await outer()
+        assert outer_id is not None and outer_id == inner_id
+        assert (await outer())[0] != outer_id
+        assert get_call_id() is None
 
 
 @pytest.mark.unit
 class TestToolsErrorHandling:
     """测试工具类的错误处理"""
     
-    def test_create_order_with_ccxt_error(self, tools_with_mock_exchange):
+    @pytest.mark.asyncio
+    async def test_create_order_with_ccxt_error(self, tools_with_mock_exchange):
         """测试订单创建时的ccxt错误处理"""
         mock_exchange = tools_with_mock_exchange._get_exchange('test_account')
         mock_exchange.create_order.side_effect = ccxt.InsufficientFunds("余额不足")
         
         with pytest.raises(Exception) as exc_info:
-            tools_with_mock_exchange.create_spot_order(
-                'test_account', 'BTC/USDT', 'buy', 0.01, 50000
+            await tools_with_mock_exchange.create_spot_order(
+                'test_account', 'BTC/USDT', 'buy', 0.01, 'limit', 50000
             )
         
         assert "余额不足" in str(exc_info.value)
     
-    def test_get_balance_with_auth_error(self, tools_with_mock_exchange):
+    @pytest.mark.asyncio
+    async def test_invalid_order_rejected_locally(self, tools_with_mock_exchange):
+        """测试无效的下单参数在本地失败，不请求交易所"""
+        mock_exchange = tools_with_mock_exchange._get_exchange('test_account')
+        
+        with pytest.raises(RuntimeError, match="无效的买卖方向"):
+            await tools_with_mock_exchange.create_spot_order('test_account', 'BTC/USDT', 'long', 0.01, 'limit', 50000)
+        with pytest.raises(RuntimeError, match="无效的订单类型"):
+            await tools_with_mock_exchange.create_spot_order('test_account', 'BTC/USDT', 'buy', 0.01, 'limt', 50000)
+        with pytest.raises(RuntimeError, match="LIMIT订单必须指定价格"):
+            await tools_with_mock_exchange.create_futures_order('test_account', 'BTC/USDT', 'SELL', 0.01, 'LIMIT')
+        with pytest.raises(RuntimeError, match="stop_loss_limit订单必须指定价格"):
+            await tools_with_mock_exchange.create_spot_order('test_account', 'BTC/USDT', 'sell', 0.01, 'stop_loss_limit')
+        with pytest.raises(RuntimeError, match="take_profit订单必须指定价格"):
+            await tools_with_mock_exchange.create_futures_order('test_account', 'BTC/USDT', 'sell', 0.01, 'take_profit')
+        
+        mock_exchange.create_order.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_get_balance_with_auth_error(self, tools_with_mock_exchange):
         """测试获取余额时的认证错误"""
         mock_exchange = tools_with_mock_exchange._get_exchange('test_account')
         mock_exchange.fetch_balance.side_effect = ccxt.AuthenticationError("API密钥无效")
         
         with pytest.raises(Exception) as exc_info:
-            tools_with_mock_exchange.get_balance('test_account')
+            await tools_with_mock_exchange.get_balance('test_account')
         
         assert "API密钥无效" in str(exc_info.value)
\ No newline at end of file